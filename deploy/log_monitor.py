@@ -8,32 +8,63 @@ summary of recurring/new errors.
 
 State: ~/.claude-code-telegram/monitor_state.json
 Logs:  ~/.claude-code-telegram/errors_YYYY-MM-DD.txt
+
+If the python-systemd binding is installed, entries are read in-process via
+systemd.journal.Reader; otherwise a `journalctl --follow` subprocess is used.
+Either way the read position is kept in ~/.claude-code-telegram/journal.cursor.
 """
 
 from __future__ import annotations
 
+import concurrent.futures
+import fcntl
 import hashlib
+import heapq
+import html
 import json
 import os
+import queue
+import random
 import re
 import select
+import signal
 import subprocess
 import sys
+import threading
 import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from datetime import UTC, datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, TextIO, TypeVar
+
+try:  # optional: faster parsing of the per-line journal JSON
+    import orjson
+
+    _json_loads: Callable[[str], Any] = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 # ── Paths & constants ─────────────────────────────────────────────────────────
 
 PROJECT_DIR = Path(__file__).parent.parent
 DATA_DIR = Path.home() / ".claude-code-telegram"
 STATE_FILE = DATA_DIR / "monitor_state.json"
+STATE_LOCK_FILE = DATA_DIR / "monitor_state.lock"
+CURSOR_FILE = DATA_DIR / "journal.cursor"
 
 WATCHED_UNITS = ["claude-telegram-bot", "claude-telegram-watchdog"]
 SUMMARY_INTERVAL = 2 * 60 * 60   # 2 hours between summaries
 SELECT_TIMEOUT = 30               # seconds; summary checked at least this often
+JOURNAL_QUEUE_SIZE = 1000         # parsed lines buffered between reader and processor
+ALERT_BATCH_INTERVAL = 3.0        # seconds new-error alerts are held to coalesce a burst
+TELEGRAM_MAX_LENGTH = 4096
 CLASSIFY_MODEL = "claude-haiku-4-5"
+CLASSIFY_CONCURRENCY = 4          # max in-flight Anthropic classify requests
+STATE_WRITE_INTERVAL = 30         # seconds; minimum gap between state file writes
+MAX_SEEN_PATTERNS = 2000          # cap on remembered error patterns in state
+SEEN_TTL = SUMMARY_INTERVAL * 12  # forget patterns not seen for this long (24h)
 
 # journald priority: 0=emerg … 4=warning, 5=notice, 6=info, 7=debug
 # The bot writes structured JSON to stdout; journald assigns all stdout lines
@@ -41,20 +72,43 @@ CLASSIFY_MODEL = "claude-haiku-4-5"
 # at INFO level and then filter by the JSON "level" field ourselves.
 MAX_PRIORITY = 6  # capture INFO and above, filter by embedded level below
 
+# Environment for systemctl/journalctl --user calls; fixed for the process lifetime.
+_SUBPROC_ENV = {**os.environ, "XDG_RUNTIME_DIR": f"/run/user/{os.getuid()}"}
+
 # Minimum structlog level to process (case-insensitive)
 _PROCESS_LEVELS = frozenset({"warning", "warn", "error", "critical"})
 
 # ── Normalization & hashing ───────────────────────────────────────────────────
 
-_STRIP = [
-    re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.I),
-    re.compile(r"\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.\d]+)?(?:Z|[+-]\d{2}:?\d{2})?\b"),
-    re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}\b"),   # IPv4
-    re.compile(r"session_[A-Za-z0-9_-]+"),
-    re.compile(r"0x[0-9a-fA-F]+"),                # hex addresses
-    re.compile(r"\b\d+\b"),                        # bare numbers
-    re.compile(r"/[^\s:,\"']+"),                   # file paths
-]
+# Single alternation so each line is scanned once instead of once per pattern.
+# This is not equivalent to the old one-re.sub-per-pattern loop, so normalized
+# output (and the dedupe hashes derived from it) changed for some lines:
+#   - one pass takes the leftmost match, so "session_<uuid>" now collapses to
+#     a single <x> where the uuid used to be replaced first;
+#   - normalize() lowercases before matching, so "SESSION_ab" and "0XFF" are
+#     now stripped too.
+# Patterns stored before the change are alerted on once more as new.  Since
+# matching runs on lowercased text, the patterns are lowercase-only.
+# Open-ended runs use possessive quantifiers (++) so a near-miss fails at once
+# instead of backtracking through every shorter prefix; none of them needs to
+# give characters back, so matches are unchanged.
+_STRIP = re.compile(
+    "|".join([
+        r"(?P<uuid>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})",
+        r"(?P<ts>\b\d{4}-\d{2}-\d{2}[t ]\d{2}:\d{2}:\d{2}(?:[.\d]+)?(?:z|[+-]\d{2}:?\d{2})?\b)",
+        r"(?P<ipv4>\b(?:\d{1,3}\.){3}\d{1,3}\b)",
+        r"(?P<session>session_[a-z0-9_-]++)",
+        r"(?P<hex>0x[0-9a-f]++)",         # hex addresses
+        r"(?P<num>\b\d++\b)",              # bare numbers
+        r"(?P<path>/[^\s:,\"']++)",         # file paths
+    ])
+)
+_WHITESPACE = re.compile(r"\s+")
+# Normalization only looks at this much of a message: bounds regex work on
+# pathological lines while keeping far more than the 300-char sample.
+MAX_NORMALIZE_CHARS = 4096
+# Same effect as stripping each prefix in turn with its own re.sub.
+_WRAPPER_PREFIXES = re.compile(r"^(?:Claude SDK error:\s*)?(?:Claude integration failed:\s*)?")
 
 # Metadata fields to strip from JSON when deduplicating (cascading errors)
 _METADATA_FIELDS = {
@@ -78,9 +132,7 @@ def extract_core_error(msg: str) -> str:
             if "error" in data:
                 error_msg = str(data["error"])
                 # Strip common wrapper prefixes to group cascading errors
-                error_msg = re.sub(r"^Claude SDK error:\s*", "", error_msg)
-                error_msg = re.sub(r"^Claude integration failed:\s*", "", error_msg)
-                return error_msg
+                return _WRAPPER_PREFIXES.sub("", error_msg, count=1)
             
             # Otherwise, rebuild JSON with only non-metadata fields
             core = {k: v for k, v in data.items() if k not in _METADATA_FIELDS}
@@ -94,33 +146,54 @@ def extract_core_error(msg: str) -> str:
 
 def normalize(msg: str) -> str:
     # First extract core error from JSON to group cascading errors
-    msg = extract_core_error(msg)
+    msg = extract_core_error(msg)[:MAX_NORMALIZE_CHARS].lower()
     
-    for pat in _STRIP:
-        msg = pat.sub("<X>", msg)
-    return re.sub(r"\s+", " ", msg).strip().lower()
+    msg = _STRIP.sub("<x>", msg)
+    return _WHITESPACE.sub(" ", msg).strip()
 
 
 def err_hash(normalized: str) -> str:
-    return hashlib.sha256(normalized.encode()).hexdigest()[:16]
+    return hashlib.blake2b(normalized.encode(), digest_size=8).hexdigest()
+
+
+@lru_cache(maxsize=4096)
+def _line_to_hash(line: str) -> tuple[str, str]:
+    """Return (normalized, hash) for a raw line, memoized.
+
+    Noisy services repeat the same raw line many times; caching here skips
+    the JSON parse, regex pass and hashing for every repeat.
+    """
+    norm = normalize(line)
+    return norm, sys.intern(err_hash(norm))
 
 
 # ── Config helpers ────────────────────────────────────────────────────────────
 
+# (env file, its mtime_ns, parsed values) from the last _read_env() call.
+_env_cache: tuple[Path, int, dict[str, str]] | None = None
+
+
 def _read_env() -> dict[str, str]:
+    """Parse the bot's .env, re-reading it only when its mtime changes."""
+    global _env_cache
     # Priority: ~/.claude-code-telegram/config/.env → project-root .env
-    candidates = [
-        DATA_DIR / "config" / ".env",
-        PROJECT_DIR / ".env",
-    ]
-    env_file = next((p for p in candidates if p.exists()), None)
+    for env_file in (DATA_DIR / "config" / ".env", PROJECT_DIR / ".env"):
+        try:
+            mtime = env_file.stat().st_mtime_ns
+            break
+        except OSError:
+            continue
+    else:
+        return {}
+    if _env_cache and _env_cache[0] == env_file and _env_cache[1] == mtime:
+        return _env_cache[2]
     env: dict[str, str] = {}
-    if not env_file:
-        return env
-    for line in env_file.read_text().splitlines():
-        if "=" in line and not line.startswith("#"):
-            k, _, v = line.partition("=")
-            env[k.strip()] = v.strip().strip('"')
+    with env_file.open() as f:
+        for line in f:
+            if "=" in line and not line.startswith("#"):
+                k, _, v = line.partition("=")
+                env[k.strip()] = v.strip().strip('"')
+    _env_cache = (env_file, mtime, env)
     return env
 
 
@@ -145,53 +218,220 @@ def anthropic_key() -> str | None:
 
 # ── State ─────────────────────────────────────────────────────────────────────
 
+@contextmanager
+def _state_lock(operation: int) -> Iterator[None]:
+    """Hold an flock on the sidecar lock file (LOCK_SH to read, LOCK_EX to write).
+
+    A separate lock file is used because save_state() replaces STATE_FILE's
+    inode on every write, which would orphan a lock held on the file itself.
+    """
+    with STATE_LOCK_FILE.open("a") as lock:
+        fcntl.flock(lock, operation)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
 def load_state() -> dict[str, Any]:
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     if STATE_FILE.exists():
         try:
-            return json.loads(STATE_FILE.read_text())
+            with _state_lock(fcntl.LOCK_SH):
+                return json.loads(STATE_FILE.read_text())
         except Exception:
             pass
     return {"seen": {}, "last_summary_ts": 0.0}
 
 
+def prune_seen(seen: dict[str, Any]) -> None:
+    """Evict least recently seen patterns down to 90% of MAX_SEEN_PATTERNS.
+
+    Keeps memory, state-file size and summary scans bounded on long-running
+    hosts; evicted patterns are simply treated as new if they reappear.
+    """
+    if len(seen) <= MAX_SEEN_PATTERNS:
+        return
+    by_age = sorted(seen, key=lambda h: seen[h].get("last_seen_ts", 0))
+    for h in by_age[: len(seen) - MAX_SEEN_PATTERNS * 9 // 10]:
+        del seen[h]
+
+
+def pending_recovery_hashes(state: dict[str, Any]) -> set[str]:
+    """Set index over pending_recovery_checks hashes, rebuilt lazily after load."""
+    hashes = state.get("_pending_recovery_hashes")
+    if hashes is None:
+        hashes = {c["h"] for c in state.get("pending_recovery_checks", [])}
+        state["_pending_recovery_hashes"] = hashes
+    return hashes
+
+
+def mark_dirty(state: dict[str, Any]) -> None:
+    """Flag state as changed so the main loop persists it on its next write."""
+    state["_dirty"] = True
+
+
 def save_state(state: dict[str, Any]) -> None:
-    STATE_FILE.write_text(json.dumps(state, indent=2, default=str))
+    """Write state atomically (temp file + rename, under an exclusive flock).
+
+    Clears the dirty flag; other ``_``-prefixed keys are in-memory indexes and
+    are not persisted.  The lock keeps an overlapping instance (restart
+    overlap, manual run) from interleaving writes to the shared temp file.
+    """
+    state.pop("_dirty", None)
+    persisted = {k: v for k, v in state.items() if not k.startswith("_")}
+    data = json.dumps(persisted, indent=2, default=str)
+    tmp = STATE_FILE.with_suffix(".tmp")
+    with _state_lock(fcntl.LOCK_EX):
+        tmp.write_text(data)
+        os.replace(tmp, STATE_FILE)
+
+
+# ── Retry ─────────────────────────────────────────────────────────────────────
+
+_T = TypeVar("_T")
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def _retry(fn: Callable[[], _T], *, attempts: int = 4, base: float = 1.0, cap: float = 30.0) -> _T:
+    """Call fn, retrying rate-limit / 5xx failures with jittered exponential backoff.
+
+    Works with both httpx.HTTPStatusError and anthropic.APIStatusError, which
+    expose the failed httpx response as ``exc.response``.  A Retry-After header
+    takes precedence over the computed delay; either is capped at ``cap``.
+    """
+    for attempt in range(attempts):
+        try:
+            return fn()
+        except Exception as exc:
+            response = getattr(exc, "response", None)
+            status = getattr(response, "status_code", None)
+            if status not in _RETRY_STATUSES or attempt == attempts - 1:
+                raise
+            try:
+                delay = float(response.headers.get("retry-after", ""))
+            except ValueError:
+                delay = base * 2**attempt * random.uniform(0.8, 1.2)
+            delay = min(cap, delay)
+            _log(f"warn: HTTP {status} — retrying in {delay:.1f}s ({attempt + 1}/{attempts - 1})")
+            time.sleep(delay)
+    raise AssertionError("unreachable")
 
 
 # ── Telegram ──────────────────────────────────────────────────────────────────
 
-def send_telegram(text: str) -> bool:
+@lru_cache(maxsize=1)
+def _telegram_client() -> Any:
+    """Shared httpx.Client so alerts reuse one keep-alive connection."""
+    import httpx
+
+    return httpx.Client(timeout=10)
+
+
+def _post_telegram(text: str) -> int | None:
+    """Send one HTML message; return None on success, else the failing HTTP status (0 if none)."""
     import httpx
 
     token, chat_id = telegram_config()
     if not token or not chat_id:
         _log("warn: Telegram not configured — skipping notification")
-        return False
-    try:
-        resp = httpx.post(
+        return 0
+
+    def post() -> httpx.Response:
+        resp = _telegram_client().post(
             f"https://api.telegram.org/bot{token}/sendMessage",
             json={"chat_id": chat_id, "text": text, "parse_mode": "HTML"},
-            timeout=10,
         )
-        return resp.status_code == 200
+        resp.raise_for_status()
+        return resp
+
+    try:
+        _retry(post)
+        return None
     except Exception as exc:
         _log(f"warn: Telegram send failed: {exc}")
-        return False
+        return getattr(getattr(exc, "response", None), "status_code", 0)
+
+
+def send_telegram(text: str) -> bool:
+    return _post_telegram(text) is None
+
+
+# New-error alerts waiting to be coalesced, and when the oldest was queued.
+_pending_alerts: list[str] = []
+_pending_alerts_since = 0.0
+
+
+def queue_alert(text: str) -> None:
+    """Queue an alert; flush_alerts() sends queued alerts together."""
+    global _pending_alerts_since
+    if not _pending_alerts:
+        _pending_alerts_since = time.time()
+    _pending_alerts.append(text)
+
+
+_ALERT_SEPARATOR = "\n\n━━━━━━━━━━\n\n"
+
+
+def _send_alert_batch(batch: list[str]) -> None:
+    """Send alerts as one message; if Telegram rejects it, send each on its own.
+
+    A 400 means the markup or length was refused.  Resending individually
+    confines the damage to the offending alert instead of losing the batch.
+    """
+    status = _post_telegram(_ALERT_SEPARATOR.join(batch))
+    if status == 400 and len(batch) > 1:
+        for alert in batch:
+            _post_telegram(alert)
+
+
+def flush_alerts(force: bool = False) -> None:
+    """Send queued alerts once ALERT_BATCH_INTERVAL has passed (or if forced).
+
+    An error burst becomes one message per TELEGRAM_MAX_LENGTH batch instead
+    of one request per pattern, which also keeps us under Telegram's rate limit.
+    Batches are split between alerts, never inside one, so no tag or HTML
+    entity is ever cut in half.
+    """
+    if not _pending_alerts:
+        return
+    if not force and time.time() - _pending_alerts_since < ALERT_BATCH_INTERVAL:
+        return
+    batch: list[str] = []
+    size = 0
+    for alert in _pending_alerts:
+        if batch and size + len(_ALERT_SEPARATOR) + len(alert) > TELEGRAM_MAX_LENGTH:
+            _send_alert_batch(batch)
+            batch, size = [], 0
+        size += len(alert) + (len(_ALERT_SEPARATOR) if batch else 0)
+        batch.append(alert)
+    _send_alert_batch(batch)
+    _pending_alerts.clear()
 
 
 # ── Classification ────────────────────────────────────────────────────────────
 
+# Words that make a plain-text line worth looking at.  Most are only hints
+# ("security", "unauthorized", "reverted" show up in routine warnings too), so
+# a hit here admits the line but leaves the verdict to Claude.
 _HEURISTIC_CRITICAL = re.compile(
-    r"fatal|crash|panic|segfault|oom|out of memory|security|"
-    r"unauthorized|reverted|data.?loss|corrupt",
+    r"\b(?:fatal|crash(?:ed|es)?|panic(?:ked)?|segfault|oom|out of memory|security|"
+    r"unauthorized|reverted|data.?loss|corrupt(?:ed|ion)?)\b",
+    re.I,
+)
+# Failures no context can soften; only these skip Claude and page at once.
+_HEURISTIC_SURE_CRITICAL = re.compile(
+    r"\b(?:segfault|segmentation fault|out of memory|oom[- ]?kill(?:ed|er)?|panic(?:ked)?)\b",
     re.I,
 )
+# Lines that are unmistakably lifecycle noise: a leading systemd-style verb
+# ("Started claude-telegram-bot.service"), a whole-word heartbeat/getUpdates,
+# or an HTTP access line.  Anything looser (bare substrings such as "ping" or
+# "connected") also hits real failures, so those lines go to Claude instead.
 _HEURISTIC_IGNORE = re.compile(
-    r"starting|started|stopping|stopped|reloading|loaded|"
-    r"listening|connected|heartbeat|ping|typing|"
-    r"shutdown|cleanup|initializ|"
-    r"HTTP/1\.[01]|getUpdates|200 OK",
+    r"^\s*(?:starting|started|stopping|stopped|reloading|reloaded|listening)\b"
+    r"|\b(?:heartbeat|getupdates)\b"
+    r"|\bhttp/1\.[01]\b.*\b200 ok\b",
     re.I,
 )
 
@@ -209,19 +449,33 @@ _EXPECTED_SHUTDOWN_PATTERN = re.compile(
 _EXPECTED_SHUTDOWN_WINDOW = 120  # seconds after which suppression expires
 
 
+_SERVICE_ACTIVE_TTL = 5  # seconds to reuse a systemctl is-active answer
+_service_active_cache: dict[str, tuple[float, bool]] = {}
+
+
 def _is_service_active(unit: str) -> bool:
-    """Return True if the systemd user unit is currently active."""
+    """Return True if the systemd user unit is currently active.
+
+    Results are cached per unit for _SERVICE_ACTIVE_TTL seconds so several
+    pending checks for the same unit don't each fork systemctl.
+    """
+    now = time.monotonic()
+    cached = _service_active_cache.get(unit)
+    if cached and now - cached[0] < _SERVICE_ACTIVE_TTL:
+        return cached[1]
     try:
         result = subprocess.run(
             ["systemctl", "--user", "is-active", unit],
             capture_output=True,
             text=True,
             timeout=5,
-            env={**os.environ, "XDG_RUNTIME_DIR": f"/run/user/{os.getuid()}"},
+            env=_SUBPROC_ENV,
         )
-        return result.returncode == 0
+        active = result.returncode == 0
     except Exception:
-        return False  # assume down if check fails
+        active = False  # assume down if check fails
+    _service_active_cache[unit] = (now, active)
+    return active
 
 
 def flush_recovery_checks(state: dict[str, Any]) -> None:
@@ -267,38 +521,50 @@ def flush_recovery_checks(state: dict[str, Any]) -> None:
         if h not in seen:
             severity = classify(line)
             if severity != "IGNORE":
-                entry: dict[str, Any] = {
-                    "first_seen": datetime.now(UTC).isoformat(),
-                    "first_seen_ts": now,
-                    "last_seen": datetime.now(UTC).isoformat(),
-                    "last_seen_ts": now,
-                    "count": 1,
-                    "severity": severity,
-                    "sample": line[:300],
-                    "normalized": norm,
-                }
-                seen[h] = entry
-                log_file = append_error_log(severity, line, norm, h)
-                _log(f"new {severity} [{h}]: {line[:80]}")
-                icon = "🔴" if severity == "CRITICAL" else "🟡"
-                send_telegram(
-                    f"{icon} <b>New {severity} error</b>\n\n"
-                    f"<code>{line[:400]}</code>\n\n"
-                    f"ID: <code>{h}</code>  •  📄 <code>{log_file}</code>"
-                )
-
-    state["pending_recovery_checks"] = remaining
+                record_new_pattern(state, h, line, norm, severity, now, now)
+
+    if len(remaining) != len(pending):
+        state["pending_recovery_checks"] = remaining
+        state["_pending_recovery_hashes"] = {c["h"] for c in remaining}
+        mark_dirty(state)
+
+
+@lru_cache(maxsize=1)
+def _classify_pool() -> concurrent.futures.ThreadPoolExecutor:
+    """Worker pool for classify(); its size caps concurrent Anthropic requests."""
+    return concurrent.futures.ThreadPoolExecutor(
+        max_workers=CLASSIFY_CONCURRENCY, thread_name_prefix="classify"
+    )
+
+
+# New patterns awaiting a verdict from the pool, keyed by hash.
+_classifying: dict[str, dict[str, Any]] = {}
+
+
+@lru_cache(maxsize=1)
+def _anthropic_client(api_key: str) -> Any:
+    """Shared anthropic.Anthropic client (keeps its connection pool warm)."""
+    import anthropic
+
+    # Retries are handled by _retry so backoff behaves the same as send_telegram.
+    return anthropic.Anthropic(api_key=api_key, max_retries=0)
 
 
 def classify(line: str) -> str:
-    """Return CRITICAL, WARNING, or IGNORE via Claude Haiku (heuristic fallback)."""
+    """Return CRITICAL, WARNING, or IGNORE.
+
+    Lines the keyword heuristic is sure about are decided locally; Claude
+    Haiku is only asked about the ambiguous rest (heuristic fallback on error).
+    """
+    verdict = _heuristic_match(line)
+    if verdict:
+        return verdict
     api_key = anthropic_key()
     if not api_key:
-        return _heuristic_classify(line)
+        return "WARNING"
     try:
-        import anthropic
-        client = anthropic.Anthropic(api_key=api_key)
-        resp = client.messages.create(
+        client = _anthropic_client(api_key)
+        resp = _retry(lambda: client.messages.create(
             model=CLASSIFY_MODEL,
             max_tokens=10,
             messages=[{
@@ -312,33 +578,77 @@ def classify(line: str) -> str:
                     f"Log: {line[:500]}"
                 ),
             }],
-        )
+        ))
         verdict = resp.content[0].text.strip().upper()
         return verdict if verdict in ("CRITICAL", "WARNING", "IGNORE") else "WARNING"
     except Exception as exc:
         _log(f"warn: Claude classify failed: {exc}")
-        return _heuristic_classify(line)
+        return "WARNING"
 
 
-def _heuristic_classify(line: str) -> str:
-    if _HEURISTIC_IGNORE.search(line):
-        return "IGNORE"
-    if _HEURISTIC_CRITICAL.search(line):
+def _heuristic_text(line: str) -> str:
+    """Return the human-written part of a log line for keyword matching.
+
+    Structured lines are reduced to their event/error text so field names and
+    values such as "logger": "src.security.auth" cannot trip a keyword.
+    """
+    try:
+        data = _json_loads(line)
+    except (json.JSONDecodeError, TypeError):
+        return line
+    if not isinstance(data, dict):
+        return line
+    text = " ".join(str(data[k]) for k in ("event", "error") if data.get(k))
+    return text or extract_core_error(line)
+
+
+def _heuristic_match(line: str) -> str | None:
+    """Return CRITICAL or IGNORE when a keyword decides the line, else None.
+
+    CRITICAL is checked first so a lifecycle word can never mask a failure
+    ("Stopping after segfault in worker").
+    """
+    text = _heuristic_text(line)
+    if _HEURISTIC_SURE_CRITICAL.search(text):
         return "CRITICAL"
-    return "WARNING"
+    if _HEURISTIC_IGNORE.search(text):
+        return "IGNORE"
+    return None
 
 
 # ── Error log file ────────────────────────────────────────────────────────────
 
-def append_error_log(severity: str, line: str, normalized: str, h: str) -> Path:
-    today = datetime.now(UTC).strftime("%Y-%m-%d")
-    log_file = DATA_DIR / f"errors_{today}.txt"
-    ts = datetime.now(UTC).isoformat()
-    with log_file.open("a") as f:
-        f.write(f"[{ts}] [{severity}] [{h}]\n{line}\n  norm: {normalized}\n\n")
+# Open handle for today's error log: (path, file).  Rotated when the date changes.
+_error_log: tuple[Path, TextIO] | None = None
+
+
+def append_error_log(
+    severity: str, line: str, normalized: str, h: str, now_iso: str | None = None
+) -> Path:
+    global _error_log
+    ts = now_iso or datetime.now(UTC).isoformat()
+    log_file = DATA_DIR / f"errors_{ts[:10]}.txt"  # ISO timestamps start with YYYY-MM-DD
+    if _error_log is None or _error_log[0] != log_file:
+        close_error_log()
+        # Block-buffered: records from one batch of journal lines are written
+        # together when the main loop calls flush_error_log().
+        _error_log = (log_file, log_file.open("a", buffering=65536))
+    _error_log[1].write(f"[{ts}] [{severity}] [{h}]\n{line}\n  norm: {normalized}\n\n")
     return log_file
 
 
+def flush_error_log() -> None:
+    if _error_log is not None:
+        _error_log[1].flush()
+
+
+def close_error_log() -> None:
+    global _error_log
+    if _error_log is not None:
+        _error_log[1].close()
+        _error_log = None
+
+
 # ── Summary ───────────────────────────────────────────────────────────────────
 
 def maybe_send_summary(state: dict[str, Any]) -> bool:
@@ -348,15 +658,31 @@ def maybe_send_summary(state: dict[str, Any]) -> bool:
 
     seen: dict[str, Any] = state.get("seen", {})
     window_start = now - SUMMARY_INTERVAL
-    recent = [(h, e) for h, e in seen.items() if e.get("last_seen_ts", 0) >= window_start]
+    expire_before = now - SEEN_TTL
+
+    # One pass over seen: collect the window's patterns and count new ones,
+    # and drop long-dormant patterns while we're here.
+    recent: list[tuple[str, dict[str, Any]]] = []
+    stale: list[str] = []
+    new_count = 0
+    for h, e in seen.items():
+        last_seen_ts = e.get("last_seen_ts", 0)
+        if last_seen_ts >= window_start:
+            recent.append((h, e))
+            if e.get("first_seen_ts", 0) >= window_start:
+                new_count += 1
+        elif last_seen_ts < expire_before:
+            stale.append(h)
+    for h in stale:
+        del seen[h]
 
     state["last_summary_ts"] = now
+    mark_dirty(state)
 
     if not recent:
         return False
 
-    new_count = sum(1 for _, e in recent if e.get("first_seen_ts", 0) >= window_start)
-    top5 = sorted(recent, key=lambda x: x[1].get("count", 0), reverse=True)[:5]
+    top5 = heapq.nlargest(5, recent, key=lambda x: x[1].get("count", 0))
 
     today = datetime.now(UTC).strftime("%Y-%m-%d")
     log_path = DATA_DIR / f"errors_{today}.txt"
@@ -369,7 +695,7 @@ def maybe_send_summary(state: dict[str, Any]) -> bool:
         for _, e in top5:
             icon = "🔴" if e.get("severity") == "CRITICAL" else "🟡"
             cnt = e.get("count", 1)
-            sample = (e.get("sample") or "")[:100]
+            sample = html.escape((e.get("sample") or "")[:100], quote=False)
             parts.append(f"{icon} [{cnt}×] <code>{sample}</code>")
 
     parts.append(f"\n📄 <code>{log_path}</code>")
@@ -384,12 +710,214 @@ def _journal_cmd() -> list[str]:
     return [
         "journalctl", "--user",
         "--follow", "--output=json",
+        "--output-fields=MESSAGE",  # only field we read; shrinks each JSON record
         "--priority", str(MAX_PRIORITY),
+        # Resume after the last entry seen by the previous run (journalctl
+        # writes the cursor on exit); -n 0 only applies when there is none.
+        f"--cursor-file={CURSOR_FILE}",
         "-n", "0",
         *unit_args,
     ]
 
 
+class _JournalctlSource:
+    """Tail the journal through a `journalctl --follow --output=json` subprocess."""
+
+    def __init__(self) -> None:
+        self.proc = subprocess.Popen(
+            _journal_cmd(),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+            env=_SUBPROC_ENV,
+        )
+        assert self.proc.stdout is not None
+        self.stdout = self.proc.stdout
+
+    def read(self, timeout: float) -> list[tuple[str, str]] | None:
+        """Block until journalctl emits a line; None once it has exited.
+
+        Runs on the _JournalPump thread, so blocking is fine and interrupt()
+        unblocks it by terminating journalctl.  (select() on the pipe would
+        miss lines already sitting in the text wrapper's read buffer.)
+        """
+        raw = self.stdout.readline()
+        if not raw:
+            return None
+        parsed = _parse_journal_line(raw)
+        return [parsed] if parsed else []
+
+    def interrupt(self) -> None:
+        """Wake a blocked read(): journalctl exits and the pipe hits EOF."""
+        self.proc.terminate()
+
+    def close(self) -> None:
+        self.proc.terminate()
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+        self.stdout.close()
+
+
+class _JournalReaderSource:
+    """Tail the journal in-process via python-systemd's journal.Reader.
+
+    Avoids the journalctl subprocess and the JSON round trip: the journal fd is
+    polled directly and entries arrive as dicts with MESSAGE already decoded.
+    Resumes from CURSOR_FILE, which uses the same format as journalctl's
+    --cursor-file, so either source can pick up where the other stopped.
+    """
+
+    def __init__(self, journal: Any) -> None:
+        self.reader = journal.Reader(flags=journal.CURRENT_USER)
+        self.reader.log_level(MAX_PRIORITY)
+        for unit in WATCHED_UNITS:
+            self.reader.add_match(_SYSTEMD_USER_UNIT=f"{unit}.service")
+        self.cursor = self._load_cursor()
+        if self.cursor:
+            self.reader.seek_cursor(self.cursor)
+            self.reader.get_next()  # positioned on the last entry already handled
+        else:
+            self.reader.seek_tail()
+            self.reader.get_previous()
+        self.poller = select.poll()
+        self.poller.register(self.reader.fileno(), self.reader.get_events())
+
+    @staticmethod
+    def _load_cursor() -> str | None:
+        try:
+            return CURSOR_FILE.read_text().strip() or None
+        except OSError:
+            return None
+
+    def _drain(self) -> list[tuple[str, str]]:
+        out: list[tuple[str, str]] = []
+        for entry in self.reader:
+            self.cursor = entry.get("__CURSOR", self.cursor)
+            parsed = _parse_message(entry.get("MESSAGE"))
+            if parsed:
+                out.append(parsed)
+        return out
+
+    def read(self, timeout: float) -> list[tuple[str, str]] | None:
+        # Entries already in the journal (e.g. backlog after resuming from the
+        # cursor) don't raise fd events, so drain before waiting.
+        batch = self._drain()
+        if batch:
+            return batch
+        if not self.poller.poll(timeout * 1000):
+            return []
+        self.reader.process()
+        return self._drain()
+
+    def interrupt(self) -> None:
+        """Nothing to do: read() never waits longer than its poll timeout."""
+
+    def close(self) -> None:
+        if self.cursor:
+            CURSOR_FILE.write_text(self.cursor + "\n")
+        self.reader.close()
+
+
+def _open_journal_source() -> _JournalctlSource | _JournalReaderSource:
+    try:
+        from systemd import journal
+
+        return _JournalReaderSource(journal)
+    except ImportError:
+        pass
+    except Exception as exc:
+        _log(f"warn: journal.Reader unavailable ({exc}) — falling back to journalctl")
+    return _JournalctlSource()
+
+
+class _JournalPump:
+    """Drain a journal source on a background thread into a bounded queue.
+
+    Classification and Telegram sends are slow network calls; doing them on
+    the thread that reads journalctl's pipe lets bursts back up in the pipe.
+    The pump keeps reading while the main thread processes, and only applies
+    back-pressure once JOURNAL_QUEUE_SIZE lines are waiting.
+    """
+
+    _POLL = 1.0  # seconds; how often the reader thread re-checks for stop
+    _END = None  # queue sentinel: source exited
+
+    def __init__(self, source: _JournalctlSource | _JournalReaderSource) -> None:
+        self.source = source
+        self.queue: queue.Queue[tuple[str, str] | None] = queue.Queue(maxsize=JOURNAL_QUEUE_SIZE)
+        self._stop = threading.Event()
+        self._ended = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="journal-reader", daemon=True)
+        self._thread.start()
+
+    def _put(self, item: tuple[str, str] | None) -> None:
+        while not self._stop.is_set():
+            try:
+                self.queue.put(item, timeout=self._POLL)
+                return
+            except queue.Full:
+                continue
+
+    def _run(self) -> None:
+        try:
+            while not self._stop.is_set():
+                batch = self.source.read(self._POLL)
+                if batch is None:
+                    break
+                for item in batch:
+                    self._put(item)
+        except Exception as exc:
+            if not self._stop.is_set():
+                _log(f"error in journal reader: {exc}")
+        finally:
+            self._put(self._END)
+
+    def read(self, timeout: float) -> list[tuple[str, str]] | None:
+        """Return everything queued, waiting up to timeout for the first line.
+
+        Returns None once the source has exited and the queue is drained.
+        """
+        if self._ended:
+            return None
+        try:
+            items = [self.queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                items.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if self._END in items:
+            self._ended = True
+            items = items[: items.index(self._END)]
+            return items or None
+        return items  # type: ignore[return-value]
+
+    def close(self) -> None:
+        """Stop the reader thread, then close the source it was reading.
+
+        The source is interrupted first so a read blocked on journalctl's pipe
+        returns at once, and only closed after the thread has been joined, so
+        it is never freed under a read in progress.  Safe to call more than once.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._stop.set()
+        self.source.interrupt()
+        self._thread.join(timeout=5)
+        self.source.close()
+
+
+_MESSAGE_FIELD = re.compile(r'"MESSAGE"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
 def _parse_journal_line(raw: str) -> tuple[str, str] | None:
     """Return (message_text, level) or None if line should be skipped.
 
@@ -402,17 +930,32 @@ def _parse_journal_line(raw: str) -> tuple[str, str] | None:
     raw = raw.strip()
     if not raw:
         return None
+    # Fast path: pull the MESSAGE string straight out of the envelope and only
+    # JSON-decode it if it contains escapes; full parse for anything unusual
+    # (binary MESSAGE arrays, non-JSON lines).
+    m = _MESSAGE_FIELD.search(raw)
+    if m:
+        message = m.group(1)
+        if "\\" in message:
+            message = _json_loads(f'"{message}"')
+        return _parse_message(message)
     try:
-        outer = json.loads(raw)
+        outer = _json_loads(raw)
         message = outer.get("MESSAGE") or ""
     except json.JSONDecodeError:
         message = raw
+    return _parse_message(message)
+
 
+def _parse_message(message: Any) -> tuple[str, str] | None:
+    """Filter a journal MESSAGE field by its embedded level (see _parse_journal_line)."""
     if not message:
         return None
 
     # Ensure message is a string (journald sometimes includes non-string types)
-    if not isinstance(message, str):
+    if isinstance(message, bytes):
+        message = message.decode("utf-8", errors="replace")
+    elif not isinstance(message, str):
         try:
             message = json.dumps(message)
         except Exception:
@@ -421,14 +964,15 @@ def _parse_journal_line(raw: str) -> tuple[str, str] | None:
     # Try to parse the bot's embedded JSON payload to extract log level
     level = "unknown"
     try:
-        inner = json.loads(message)
+        inner = _json_loads(message)
         if isinstance(inner, dict):
-            level_val = inner.get("level") or "unknown"
-            # Handle case where level itself might be a list or other type
-            if isinstance(level_val, str):
-                level = level_val.lower()
-            else:
-                level = str(level_val).lower()
+            level_val = inner.get("level")
+            if level_val:
+                # Handle case where level itself might be a list or other type
+                if not isinstance(level_val, str):
+                    level_val = str(level_val)
+                # structlog already emits lowercase; skip the lower() copy then
+                level = level_val if level_val in _PROCESS_LEVELS else level_val.lower()
     except (json.JSONDecodeError, TypeError):
         pass  # plain-text message — pass through without level filtering
 
@@ -453,26 +997,44 @@ def _log(msg: str) -> None:
     print(f"[log-monitor {datetime.now(UTC).strftime('%H:%M:%S')}] {msg}", flush=True)
 
 
-def process_line(line: str, state: dict[str, Any]) -> None:
+_iso_cache: tuple[float, str] = (0.0, "")
+
+
+def _utc_iso(ts: float) -> str:
+    """ISO-8601 UTC string for ts; repeated calls with the same ts reuse it.
+
+    run() stamps a whole batch of journal lines with one timestamp, so this
+    formats once per batch rather than once per line.
+    """
+    global _iso_cache
+    if _iso_cache[0] != ts:
+        _iso_cache = (ts, datetime.fromtimestamp(ts, UTC).isoformat())
+    return _iso_cache[1]
+
+
+def process_line(line: str, state: dict[str, Any], now: float | None = None) -> None:
     # Ensure line is a string (sometimes JSON fields are lists/dicts, not strings)
     if not isinstance(line, str):
         line = str(line)
     
-    norm = normalize(line)
-    h = err_hash(norm)
-    now = time.time()
+    norm, h = _line_to_hash(line)
+    if now is None:
+        now = time.time()
     seen: dict[str, Any] = state.setdefault("seen", {})
 
     # Expected-shutdown marker: record timestamp and skip alerting.
     if _EXPECTED_SHUTDOWN_PATTERN.search(line):
         state["last_expected_shutdown_ts"] = now
+        mark_dirty(state)
         _log(f"expected shutdown recorded: {line[:80]}")
         return
 
     # "Not running" warning: defer — only alert if service stays down after grace period.
     if _RECOVERY_CHECK_PATTERN.search(line):
         pending: list[dict[str, Any]] = state.setdefault("pending_recovery_checks", [])
-        if not any(c["h"] == h for c in pending):
+        pending_hashes = pending_recovery_hashes(state)
+        if h not in pending_hashes:
+            pending_hashes.add(h)
             pending.append({
                 "ts": now,
                 "h": h,
@@ -480,94 +1042,161 @@ def process_line(line: str, state: dict[str, Any]) -> None:
                 "norm": norm,
                 "unit": WATCHED_UNITS[0],
             })
+            mark_dirty(state)
             _log(f"recovery: deferred check for [{h}]: {line[:60]}")
         return
 
-    if h in seen:
-        entry = seen[h]
+    now_iso = _utc_iso(now)
+
+    entry = seen.get(h)
+    if entry is not None:
         entry["count"] = entry.get("count", 1) + 1
         entry["last_seen_ts"] = now
-        entry["last_seen"] = datetime.now(UTC).isoformat()
-        append_error_log(entry.get("severity", "WARNING"), line, norm, h)
+        entry["last_seen"] = now_iso
+        mark_dirty(state)
+        append_error_log(entry.get("severity", "WARNING"), line, norm, h, now_iso)
         return
 
-    # New pattern — classify and notify
-    severity = classify(line)
-    if severity == "IGNORE":
+    # New pattern — classify in the background; finish_classifications()
+    # records and alerts once the verdict is in.  Repeats meanwhile are counted.
+    pending = _classifying.get(h)
+    if pending is not None:
+        pending["count"] += 1
+        pending["last_seen_ts"] = now
         return
-
-    entry: dict[str, Any] = {
-        "first_seen": datetime.now(UTC).isoformat(),
+    _classifying[h] = {
+        "future": _classify_pool().submit(classify, line),
+        "line": line,
+        "norm": norm,
         "first_seen_ts": now,
-        "last_seen": datetime.now(UTC).isoformat(),
         "last_seen_ts": now,
         "count": 1,
+    }
+
+
+def record_new_pattern(
+    state: dict[str, Any],
+    h: str,
+    line: str,
+    norm: str,
+    severity: str,
+    first_seen_ts: float,
+    last_seen_ts: float,
+    count: int = 1,
+) -> None:
+    """Add a classified pattern to state, log it and queue its alert."""
+    seen: dict[str, Any] = state.setdefault("seen", {})
+    first_iso = _utc_iso(first_seen_ts)
+    seen[h] = {
+        "first_seen": first_iso,
+        "first_seen_ts": first_seen_ts,
+        "last_seen": _utc_iso(last_seen_ts),
+        "last_seen_ts": last_seen_ts,
+        "count": count,
         "severity": severity,
         "sample": line[:300],
         "normalized": norm,
     }
-    seen[h] = entry
+    prune_seen(seen)
+    mark_dirty(state)
 
-    log_file = append_error_log(severity, line, norm, h)
+    log_file = append_error_log(severity, line, norm, h, first_iso)
     _log(f"new {severity} [{h}]: {line[:80]}")
 
     icon = "🔴" if severity == "CRITICAL" else "🟡"
-    send_telegram(
+    queue_alert(
         f"{icon} <b>New {severity} error</b>\n\n"
-        f"<code>{line[:400]}</code>\n\n"
+        f"<code>{html.escape(line[:400], quote=False)}</code>\n\n"
         f"ID: <code>{h}</code>  •  📄 <code>{log_file}</code>"
     )
 
 
+def finish_classifications(state: dict[str, Any], timeout: float | None = 0) -> None:
+    """Record new patterns whose classification has completed.
+
+    With timeout=None (shutdown) waits for every outstanding classification.
+    """
+    if not _classifying:
+        return
+    futures = [p["future"] for p in _classifying.values()]
+    concurrent.futures.wait(futures, timeout=timeout)
+    for h, pending in list(_classifying.items()):
+        if not pending["future"].done():
+            continue
+        del _classifying[h]
+        severity = pending["future"].result()  # classify() never raises
+        if severity == "IGNORE":
+            continue
+        record_new_pattern(
+            state, h, pending["line"], pending["norm"], severity,
+            pending["first_seen_ts"], pending["last_seen_ts"], pending["count"],
+        )
+
+
+def _handle_sigterm(signum: int, frame: Any) -> None:
+    # systemd stops the unit with SIGTERM; route it through the same path as
+    # Ctrl-C so unsaved state is flushed before exit.
+    raise KeyboardInterrupt
+
+
 def run() -> None:
+    signal.signal(signal.SIGTERM, _handle_sigterm)
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     state = load_state()
     if state.get("last_summary_ts", 0) == 0:
         state["last_summary_ts"] = time.time()
+    last_state_write = 0.0
 
     _log(f"Started. Watching: {WATCHED_UNITS}")
 
     while True:
-        proc = subprocess.Popen(
-            _journal_cmd(),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.DEVNULL,
-            text=True,
-            bufsize=1,
-            env={**os.environ, "XDG_RUNTIME_DIR": f"/run/user/{os.getuid()}"},
-        )
-        assert proc.stdout is not None
+        source = _JournalPump(_open_journal_source())
 
         try:
-            while proc.poll() is None:
-                readable, _, _ = select.select([proc.stdout], [], [], SELECT_TIMEOUT)
-
-                if readable:
-                    raw = proc.stdout.readline()
-                    if not raw:
-                        break
-                    parsed = _parse_journal_line(raw)
-                    if parsed:
-                        msg, _level = parsed
-                        process_line(msg, state)
-
-                if maybe_send_summary(state):
-                    _log("Summary sent")
+            while True:
+                busy = _pending_alerts or _classifying
+                batch = source.read(ALERT_BATCH_INTERVAL if busy else SELECT_TIMEOUT)
+                if batch is None:
+                    break
+                batch_ts = time.time()
+                for msg, _level in batch:
+                    process_line(msg, state, batch_ts)
+
+                finish_classifications(state)
+                flush_error_log()
+                flush_alerts()
+
+                summary_sent = maybe_send_summary(state)
+                if summary_sent:
+                    info = _line_to_hash.cache_info()
+                    _log(f"Summary sent (line cache: {info.hits} hits / {info.misses} misses)")
 
                 flush_recovery_checks(state)
-                save_state(state)
+
+                # Persist right after a summary so a crash can't resend it.
+                now = time.time()
+                due = now - last_state_write >= STATE_WRITE_INTERVAL
+                if state.get("_dirty") and (due or summary_sent):
+                    save_state(state)
+                    last_state_write = now
 
         except KeyboardInterrupt:
-            proc.terminate()
+            finish_classifications(state, timeout=None)
+            flush_alerts(force=True)
             save_state(state)
+            close_error_log()
+            _telegram_client().close()
             _log("Stopped.")
             sys.exit(0)
         except Exception as exc:
             _log(f"error in main loop: {exc}")
         finally:
-            proc.terminate()
+            source.close()
 
-        _log("journalctl exited — restarting in 10s")
+        if state.get("_dirty"):
+            save_state(state)
+            last_state_write = time.time()
+        _log("journal source exited — restarting in 10s")
         time.sleep(10)
         state = load_state()
 
@@ -9,13 +9,79 @@ Features:
 """
 
 import base64
-from dataclasses import dataclass
+import io
+import struct
+from dataclasses import dataclass, field
+from functools import cached_property
 from typing import Any
 
 from telegram import PhotoSize
 
 from src.config import Settings
 
+try:  # Optional SIMD-accelerated encoder; falls back to the stdlib codec.
+    from pybase64 import b64encode_as_string as _b64encode
+except ImportError:
+
+    def _b64encode(data: bytes | bytearray) -> str:
+        return base64.b64encode(data).decode("ascii")
+
+
+_SCREENSHOT_PROMPT = """I'm sharing a screenshot with you. Please analyze it and help me with:
+
+1. Identifying what application or website this is from
+2. Understanding the UI elements and their purpose
+3. Any issues or improvements you notice
+4. Answering any specific questions I have
+
+"""
+
+_DIAGRAM_PROMPT = """I'm sharing a diagram with you. Please help me:
+
+1. Understand the components and their relationships
+2. Identify the type of diagram (flowchart, architecture, etc.)
+3. Explain any technical concepts shown
+4. Suggest improvements or clarifications
+
+"""
+
+_UI_PROMPT = """I'm sharing a UI mockup with you. Please analyze:
+
+1. The layout and visual hierarchy
+2. User experience considerations
+3. Accessibility aspects
+4. Implementation suggestions
+5. Any potential improvements
+
+"""
+
+_GENERIC_PROMPT = """I'm sharing an image with you. Please analyze it and provide relevant insights.
+
+"""
+
+# image_type -> (base prompt, label used to append the caption)
+_PROMPTS: dict[str, tuple[str, str]] = {
+    "screenshot": (_SCREENSHOT_PROMPT, "Specific request"),
+    "diagram": (_DIAGRAM_PROMPT, "Specific request"),
+    "ui_mockup": (_UI_PROMPT, "Specific request"),
+    "generic": (_GENERIC_PROMPT, "Context"),
+}
+
+# First byte -> (magic prefix(es), format); one dict lookup picks the only
+# signature worth comparing
+_MAGIC: dict[int, tuple[bytes | tuple[bytes, ...], str]] = {
+    0x89: (b"\x89PNG", "png"),
+    0xFF: (b"\xff\xd8\xff", "jpeg"),
+    0x47: ((b"GIF87a", b"GIF89a"), "gif"),
+    0x52: (b"RIFF", "webp"),
+}
+
+# Read width/height pairs straight out of the buffer, without slicing
+_unpack_be32_pair = struct.Struct(">II").unpack_from
+_unpack_be16_pair = struct.Struct(">HH").unpack_from
+_unpack_le16_pair = struct.Struct("<HH").unpack_from
+_unpack_be16 = struct.Struct(">H").unpack_from
+
 
 @dataclass
 class ProcessedImage:
@@ -23,10 +89,15 @@ class ProcessedImage:
 
     prompt: str
     image_type: str
-    base64_data: str
+    image_bytes: bytes = field(repr=False)
     size: int
     metadata: dict[str, Any] | None = None
 
+    @cached_property
+    def base64_data(self) -> str:
+        """Base64 of the image, encoded on first access only"""
+        return _b64encode(self.image_bytes)
+
 
 class ImageHandler:
     """Process image uploads"""
@@ -34,46 +105,39 @@ class ImageHandler:
     def __init__(self, config: Settings):
         self.config = config
         self.supported_formats = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
+        self._supported_suffixes = tuple(self.supported_formats)
 
     async def process_image(self, photo: PhotoSize, caption: str | None = None) -> ProcessedImage:
         """Process uploaded image"""
 
-        # Download image
+        # Download image; BytesIO.getvalue() hands back its buffer without copying
         file = await photo.get_file()
-        image_bytes = await file.download_as_bytearray()
+        buf = io.BytesIO()
+        await file.download_to_memory(buf)
+        image_bytes = buf.getvalue()
 
-        # Detect image type
-        image_type = self._detect_image_type(image_bytes)
+        # Detect format once and reuse it for both classification and metadata
+        fmt = self._detect_format(image_bytes)
+        width, height = self._get_dimensions(image_bytes, fmt)
+        image_type = self._classify(width, height)
 
         # Create appropriate prompt
-        if image_type == "screenshot":
-            prompt = self._create_screenshot_prompt(caption)
-        elif image_type == "diagram":
-            prompt = self._create_diagram_prompt(caption)
-        elif image_type == "ui_mockup":
-            prompt = self._create_ui_prompt(caption)
-        else:
-            prompt = self._create_generic_prompt(caption)
-
-        # Convert to base64 for Claude (if supported in future)
-        base64_image = base64.b64encode(image_bytes).decode("utf-8")
+        prompt = self._create_prompt(image_type, caption)
 
         return ProcessedImage(
             prompt=prompt,
             image_type=image_type,
-            base64_data=base64_image,
+            image_bytes=image_bytes,
             size=len(image_bytes),
             metadata={
-                "format": self._detect_format(image_bytes),
+                "format": fmt,
                 "has_caption": caption is not None,
             },
         )
 
-    def _detect_image_type(self, image_bytes: bytes | bytearray) -> str:
-        """Detect type of image using format and dimension heuristics."""
-        fmt = self._detect_format(image_bytes)
-        width, height = self._get_dimensions(image_bytes, fmt)
-
+    @staticmethod
+    def _classify(width: int, height: int) -> str:
+        """Classify an image by its dimensions."""
         if width == 0 or height == 0:
             return "generic"
 
@@ -111,107 +175,50 @@ class ImageHandler:
         try:
             if fmt == "png" and len(image_bytes) >= 24:
                 # PNG: width at offset 16 (4 bytes BE), height at offset 20 (4 bytes BE)
-                w = int.from_bytes(image_bytes[16:20], "big")
-                h = int.from_bytes(image_bytes[20:24], "big")
-                return w, h
+                return _unpack_be32_pair(image_bytes, 16)
             elif fmt == "jpeg" and len(image_bytes) > 2:
                 # JPEG: scan for SOF0/SOF2 markers (0xFF 0xC0 / 0xFF 0xC2)
                 i = 2
-                while i < len(image_bytes) - 9:
-                    if image_bytes[i] != 0xFF:
-                        i += 1
-                        continue
+                while True:
+                    # Jump straight to the next 0xFF instead of stepping byte by byte
+                    i = image_bytes.find(b"\xff", i)
+                    if i < 0 or i >= len(image_bytes) - 9:
+                        break
                     marker = image_bytes[i + 1]
                     if marker in (0xC0, 0xC2):
-                        h = int.from_bytes(image_bytes[i + 5 : i + 7], "big")
-                        w = int.from_bytes(image_bytes[i + 7 : i + 9], "big")
+                        h, w = _unpack_be16_pair(image_bytes, i + 5)
                         return w, h
                     # Skip to next marker
-                    length = int.from_bytes(image_bytes[i + 2 : i + 4], "big")
+                    (length,) = _unpack_be16(image_bytes, i + 2)
                     i += 2 + length
             elif fmt == "gif" and len(image_bytes) >= 10:
                 # GIF: width at offset 6 (2 bytes LE), height at offset 8 (2 bytes LE)
-                w = int.from_bytes(image_bytes[6:8], "little")
-                h = int.from_bytes(image_bytes[8:10], "little")
-                return w, h
+                return _unpack_le16_pair(image_bytes, 6)
             elif fmt == "webp" and len(image_bytes) >= 30:
                 # WebP VP8: dimensions at offset 26-30
                 if image_bytes[12:16] == b"VP8 " and len(image_bytes) >= 30:
-                    w = int.from_bytes(image_bytes[26:28], "little") & 0x3FFF
-                    h = int.from_bytes(image_bytes[28:30], "little") & 0x3FFF
-                    return w, h
+                    w, h = _unpack_le16_pair(image_bytes, 26)
+                    return w & 0x3FFF, h & 0x3FFF
         except Exception:
             pass
         return 0, 0
 
     def _detect_format(self, image_bytes: bytes | bytearray) -> str:
         """Detect image format from magic bytes"""
-        # Check magic bytes for common formats
-        if image_bytes.startswith(b"\x89PNG"):
-            return "png"
-        elif image_bytes.startswith(b"\xff\xd8\xff"):
-            return "jpeg"
-        elif image_bytes.startswith(b"GIF87a") or image_bytes.startswith(b"GIF89a"):
-            return "gif"
-        elif image_bytes.startswith(b"RIFF") and b"WEBP" in image_bytes[:12]:
-            return "webp"
-        else:
+        entry = _MAGIC.get(image_bytes[0]) if image_bytes else None
+        if entry is None or not image_bytes.startswith(entry[0]):
             return "unknown"
+        # RIFF is a generic container; only the WEBP form is an image
+        if entry[1] == "webp" and b"WEBP" not in image_bytes[:12]:
+            return "unknown"
+        return entry[1]
 
-    def _create_screenshot_prompt(self, caption: str | None) -> str:
-        """Create prompt for screenshot analysis"""
-        base_prompt = """I'm sharing a screenshot with you. Please analyze it and help me with:
-
-1. Identifying what application or website this is from
-2. Understanding the UI elements and their purpose
-3. Any issues or improvements you notice
-4. Answering any specific questions I have
-
-"""
-        if caption:
-            base_prompt += f"Specific request: {caption}"
-
-        return base_prompt
-
-    def _create_diagram_prompt(self, caption: str | None) -> str:
-        """Create prompt for diagram analysis"""
-        base_prompt = """I'm sharing a diagram with you. Please help me:
-
-1. Understand the components and their relationships
-2. Identify the type of diagram (flowchart, architecture, etc.)
-3. Explain any technical concepts shown
-4. Suggest improvements or clarifications
-
-"""
-        if caption:
-            base_prompt += f"Specific request: {caption}"
-
-        return base_prompt
-
-    def _create_ui_prompt(self, caption: str | None) -> str:
-        """Create prompt for UI mockup analysis"""
-        base_prompt = """I'm sharing a UI mockup with you. Please analyze:
-
-1. The layout and visual hierarchy
-2. User experience considerations
-3. Accessibility aspects
-4. Implementation suggestions
-5. Any potential improvements
-
-"""
-        if caption:
-            base_prompt += f"Specific request: {caption}"
-
-        return base_prompt
-
-    def _create_generic_prompt(self, caption: str | None) -> str:
-        """Create generic image analysis prompt"""
-        base_prompt = """I'm sharing an image with you. Please analyze it and provide relevant insights.
-
-"""
+    @staticmethod
+    def _create_prompt(image_type: str, caption: str | None) -> str:
+        """Create the analysis prompt for an image type"""
+        base_prompt, caption_label = _PROMPTS.get(image_type, _PROMPTS["generic"])
         if caption:
-            base_prompt += f"Context: {caption}"
-
+            return f"{base_prompt}{caption_label}: {caption}"
         return base_prompt
 
     def supports_format(self, filename: str) -> bool:
@@ -219,15 +226,10 @@ class ImageHandler:
         if not filename:
             return False
 
-        # Extract extension
-        parts = filename.lower().split(".")
-        if len(parts) < 2:
-            return False
-
-        extension = f".{parts[-1]}"
-        return extension in self.supported_formats
+        # str.endswith with a tuple checks every suffix in one C call
+        return filename.lower().endswith(self._supported_suffixes)
 
-    async def validate_image(self, image_bytes: bytes) -> tuple[bool, str | None]:
+    def validate_image(self, image_bytes: bytes | bytearray) -> tuple[bool, str | None]:
         """Validate image data"""
         # Check size
         max_size = 10 * 1024 * 1024  # 10MB
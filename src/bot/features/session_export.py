@@ -5,10 +5,16 @@ from dataclasses import dataclass
 from datetime import UTC, datetime
 from enum import Enum
 
+from src.bot.utils.html_format import escape_html
 from src.storage.facade import Storage
 from src.storage.models import MessageModel, SessionModel
 from src.utils.constants import MAX_SESSION_LENGTH
 
+try:  # Optional fast serializer; falls back to the stdlib encoder.
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
 
 class ExportFormat(Enum):
     """Supported export formats."""
@@ -23,7 +29,7 @@ class ExportedSession:
     """Exported session data."""
 
     format: ExportFormat
-    content: str
+    content: bytes  # UTF-8 encoded, ready to send as a document
     filename: str
     mime_type: str
     size_bytes: int
@@ -60,25 +66,22 @@ class SessionExporter:
         Raises:
             ValueError: If session not found or invalid format
         """
-        # Get session data
-        session = await self.storage.sessions.get_session(session_id)
+        # Session and messages come back from one connection checkout
+        session, messages = await self.storage.sessions.get_session_with_messages(session_id, MAX_SESSION_LENGTH)
         if not session:
             raise ValueError(f"Session {session_id} not found")
 
-        # Get session messages
-        messages = await self.storage.messages.get_session_messages(session_id, MAX_SESSION_LENGTH)
-
-        # Export based on format
+        # Export based on format; every branch yields UTF-8 bytes, encoded once
         if format == ExportFormat.MARKDOWN:
-            content = await self._export_markdown(session, messages)
+            data = (await self._export_markdown(session, messages)).encode("utf-8")
             mime_type = "text/markdown"
             extension = "md"
         elif format == ExportFormat.JSON:
-            content = await self._export_json(session, messages)
+            data = await self._export_json(session, messages)
             mime_type = "application/json"
             extension = "json"
         elif format == ExportFormat.HTML:
-            content = await self._export_html(session, messages)
+            data = (await self._export_html(session, messages)).encode("utf-8")
             mime_type = "text/html"
             extension = "html"
         else:
@@ -90,10 +93,10 @@ class SessionExporter:
 
         return ExportedSession(
             format=format,
-            content=content,
+            content=data,
             filename=filename,
             mime_type=mime_type,
-            size_bytes=len(content.encode()),
+            size_bytes=len(data),
             created_at=datetime.now(UTC),
         )
 
@@ -107,45 +110,45 @@ class SessionExporter:
         Returns:
             Markdown formatted content
         """
-        lines = []
-
-        # Header
-        lines.append("# Claude Code Session Export")
-        lines.append(f"\n**Session ID:** `{session.session_id}`")
-        lines.append(f"**Created:** {session.created_at}")
-        lines.append(f"**Last Used:** {session.last_used}")
-        lines.append(f"**Message Count:** {len(messages)}")
-        lines.append("\n---\n")
+        header = (
+            "# Claude Code Session Export\n"
+            f"\n**Session ID:** `{session.session_id}`\n"
+            f"**Created:** {session.created_at}\n"
+            f"**Last Used:** {session.last_used}\n"
+            f"**Message Count:** {len(messages)}\n"
+            "\n---\n"
+        )
 
-        # Messages - each MessageModel is one user+Claude exchange
-        for msg in messages:
-            timestamp = msg.timestamp
-            lines.append(f"### You - {timestamp}")
-            lines.append(f"\n{msg.prompt}\n")
-            lines.append("---\n")
-            if msg.response:
-                lines.append(f"### Claude - {timestamp}")
-                lines.append(f"\n{msg.response}\n")
-                lines.append("---\n")
+        # Messages - each MessageModel is one user+Claude exchange, rendered as
+        # one string so the whole export is built by a single join
+        blocks = [header]
+        blocks.extend(
+            f"### You - {msg.timestamp}\n\n{msg.prompt}\n\n---\n"
+            + (f"\n### Claude - {msg.timestamp}\n\n{msg.response}\n\n---\n" if msg.response else "")
+            for msg in messages
+        )
 
-        return "\n".join(lines)
+        return "\n".join(blocks)
 
-    async def _export_json(self, session: SessionModel, messages: list[MessageModel]) -> str:
+    async def _export_json(self, session: SessionModel, messages: list[MessageModel]) -> bytes:
         """Export session as JSON.
 
+        Datetimes are left as objects; orjson serializes them natively and the
+        stdlib fallback calls ``isoformat()``, so both produce the same text.
+
         Args:
             session: Session metadata
             messages: List of messages
 
         Returns:
-            JSON formatted content
+            UTF-8 encoded JSON content
         """
         export_data = {
             "session": {
                 "id": session.session_id,
                 "user_id": session.user_id,
-                "created_at": session.created_at.isoformat(),
-                "last_used": session.last_used.isoformat(),
+                "created_at": session.created_at,
+                "last_used": session.last_used,
                 "message_count": len(messages),
             },
             "messages": [
@@ -153,13 +156,15 @@ class SessionExporter:
                     "id": msg.message_id,
                     "prompt": msg.prompt,
                     "response": msg.response,
-                    "timestamp": msg.timestamp.isoformat(),
+                    "timestamp": msg.timestamp,
                 }
                 for msg in messages
             ],
         }
 
-        return json.dumps(export_data, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            return orjson.dumps(export_data, option=orjson.OPT_INDENT_2)
+        return json.dumps(export_data, indent=2, ensure_ascii=False, default=datetime.isoformat).encode("utf-8")
 
     async def _export_html(self, session: SessionModel, messages: list[MessageModel]) -> str:
         """Export session as HTML.
@@ -171,9 +176,7 @@ class SessionExporter:
         Returns:
             HTML formatted content
         """
-        # Convert markdown content to HTML-safe format
-        markdown_content = await self._export_markdown(session, messages)
-        html_content = self._markdown_to_html(markdown_content)
+        html_content = self._render_html_body(session, messages)
 
         # HTML template
         template = f"""<!DOCTYPE html>
@@ -239,6 +242,10 @@ class SessionExporter:
             color: #7f8c8d;
             font-size: 0.9em;
         }}
+        .content {{
+            white-space: pre-wrap;
+            overflow-wrap: anywhere;
+        }}
         hr {{
             border: none;
             border-top: 1px solid #e1e4e8;
@@ -255,42 +262,44 @@ class SessionExporter:
 
         return template
 
-    def _markdown_to_html(self, markdown: str) -> str:
-        """Convert markdown to HTML.
+    @staticmethod
+    def _render_html_body(session: SessionModel, messages: list[MessageModel]) -> str:
+        """Render the export body as HTML straight from the session data.
 
-        Simple conversion for basic markdown elements.
+        All user and Claude text is escaped, so message content can never
+        inject markup into the exported page.
 
         Args:
-            markdown: Markdown content
+            session: Session metadata
+            messages: List of messages
 
         Returns:
-            HTML content
+            HTML body content
         """
-        html = markdown
-
-        # Headers
-        html = html.replace("# ", "<h1>").replace("\n\n", "</h1>\n\n", 1)
-        html = html.replace("### ", "<h3>").replace("\n", "</h3>\n", 3)
-
-        # Bold
-        import re
-
-        html = re.sub(r"\*\*([^*]+)\*\*", r"<strong>\1</strong>", html)
-
-        # Code blocks
-        html = re.sub(r"`([^`]+)`", r"<code>\1</code>", html)
-
-        # Line breaks and paragraphs
-        html = html.replace("\n\n", "</p>\n<p>")
-        html = f"<p>{html}</p>"
+        parts = [
+            "<h1>Claude Code Session Export</h1>\n"
+            '<div class="metadata">\n'
+            f"<strong>Session ID:</strong> <code>{escape_html(session.session_id)}</code><br>\n"
+            f"<strong>Created:</strong> {session.created_at}<br>\n"
+            f"<strong>Last Used:</strong> {session.last_used}<br>\n"
+            f"<strong>Message Count:</strong> {len(messages)}\n"
+            "</div>\n"
+        ]
 
-        # Clean up empty paragraphs
-        html = html.replace("<p></p>", "")
-        html = html.replace("<p><h", "<h")
-        html = html.replace("</h1></p>", "</h1>")
-        html = html.replace("</h3></p>", "</h3>")
-
-        # Horizontal rules
-        html = html.replace("<p>---</p>", "<hr>")
-
-        return html
+        # Messages - each MessageModel is one user+Claude exchange
+        for msg in messages:
+            parts.append(
+                '<div class="message">\n'
+                f'<h3>You <span class="timestamp">{msg.timestamp}</span></h3>\n'
+                f'<div class="content">{escape_html(msg.prompt)}</div>\n'
+                "</div>\n"
+            )
+            if msg.response:
+                parts.append(
+                    '<div class="message claude">\n'
+                    f'<h3>Claude <span class="timestamp">{msg.timestamp}</span></h3>\n'
+                    f'<div class="content">{escape_html(msg.response)}</div>\n'
+                    "</div>\n"
+                )
+
+        return "".join(parts)
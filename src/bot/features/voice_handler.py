@@ -2,7 +2,7 @@
 
 Supports two providers:
   - groq: POST to Groq Whisper API (fast, cloud-based)
-  - local: OGG -> WAV via ffmpeg, then whisper.cpp binary
+  - local: OGG -> WAV via ffmpeg, piped into the whisper.cpp binary
 
 Usage:
     handler = VoiceHandler(settings)
@@ -10,10 +10,11 @@ Usage:
 """
 
 import asyncio
-import tempfile
+import os
+import struct
 import time
-from pathlib import Path
 
+import httpx
 import structlog
 
 from ...config.settings import Settings
@@ -34,12 +35,54 @@ _WHISPER_LANG_MAP: dict[str, str] = {
     "russian": "ru",
 }
 
+_SAMPLE_RATE = 16000  # whisper.cpp expects 16kHz mono 16-bit PCM
+
+
+def _wav_header(pcm_len: int) -> bytes:
+    """Build a 44-byte RIFF header for 16kHz mono s16le PCM of the given length."""
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        36 + pcm_len,
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,  # PCM
+        1,  # mono
+        _SAMPLE_RATE,
+        _SAMPLE_RATE * 2,  # byte rate
+        2,  # block align
+        16,  # bits per sample
+        b"data",
+        pcm_len,
+    )
+
 
 class VoiceHandler:
     """Transcribe Telegram voice/audio messages to text."""
 
     def __init__(self, config: Settings) -> None:
         self.config = config
+        self._http: httpx.AsyncClient | None = None
+
+    def _get_http(self) -> httpx.AsyncClient:
+        """Return the shared Groq client, creating it on first use.
+
+        Reusing one client keeps the connection to api.groq.com alive between
+        voice messages instead of paying a TCP + TLS handshake every time.
+        """
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                timeout=60.0,
+                limits=httpx.Limits(max_keepalive_connections=4),
+            )
+        return self._http
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP client."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
 
     async def transcribe(self, ogg_bytes: bytes) -> str:
         """Transcribe OGG audio bytes to text using the configured provider."""
@@ -53,109 +96,93 @@ class VoiceHandler:
 
     async def _transcribe_groq(self, ogg_bytes: bytes) -> str:
         """Transcribe using Groq Whisper API (whisper-large-v3-turbo)."""
-        import httpx
-
         if not self.config.groq_api_key:
             raise ValueError("GROQ_API_KEY not set. Required for voice_provider=groq.")
         api_key = self.config.groq_api_key.get_secret_value()
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                "https://api.groq.com/openai/v1/audio/transcriptions",
-                headers={"Authorization": f"Bearer {api_key}"},
-                files={"file": ("audio.ogg", ogg_bytes, "audio/ogg")},
-                data={"model": "whisper-large-v3-turbo"},
-            )
-            response.raise_for_status()
-            return str(response.json().get("text", "")).strip()
+        response = await self._get_http().post(
+            "https://api.groq.com/openai/v1/audio/transcriptions",
+            headers={"Authorization": f"Bearer {api_key}"},
+            files={"file": ("audio.ogg", ogg_bytes, "audio/ogg")},
+            data={"model": "whisper-large-v3-turbo"},
+        )
+        response.raise_for_status()
+        return str(response.json().get("text", "")).strip()
 
     async def _transcribe_local(self, ogg_bytes: bytes) -> str:
-        """Transcribe using local whisper.cpp (requires ffmpeg + whisper binary)."""
-        ogg_path: Path | None = None
-        wav_path: Path | None = None
-        txt_path: Path | None = None
-
-        try:
-            with tempfile.NamedTemporaryFile(suffix=".ogg", delete=False) as f:
-                f.write(ogg_bytes)
-                ogg_path = Path(f.name)
-
-            wav_path = ogg_path.with_suffix(".wav")
-
-            t_start = time.monotonic()
-
-            # Convert OGG -> 16kHz mono WAV
-            ffmpeg_proc = await asyncio.create_subprocess_exec(
-                "ffmpeg",
-                "-y",
-                "-i",
-                str(ogg_path),
-                "-ar",
-                "16000",
-                "-ac",
-                "1",
-                "-c:a",
-                "pcm_s16le",
-                str(wav_path),
-                stdout=asyncio.subprocess.DEVNULL,
-                stderr=asyncio.subprocess.DEVNULL,
-            )
-            await ffmpeg_proc.communicate()
-            if ffmpeg_proc.returncode != 0:
-                raise RuntimeError("ffmpeg conversion failed")
-
-            duration_secs = wav_path.stat().st_size / (16000 * 2) if wav_path.exists() else 0.0
-
-            # Resolve whisper language: map display name → ISO code, "auto" → None
-            lang_setting = getattr(self.config, "preferred_language", "auto") or "auto"
-            whisper_lang: str | None = None
-            if lang_setting.lower() != "auto":
-                key = lang_setting.lower()
-                whisper_lang = _WHISPER_LANG_MAP.get(key, key)  # use as-is if already a code
-
-            # Build whisper.cpp command
-            cmd = [self.config.whisper_binary]
-            if self.config.whisper_model_path:
-                cmd += ["-m", self.config.whisper_model_path]
-            cmd += ["-f", str(wav_path), "--task", "transcribe", "-otxt"]
-            if whisper_lang:
-                cmd += ["-l", whisper_lang]
-
-            whisper_proc = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.DEVNULL,
-                stderr=asyncio.subprocess.PIPE,
+        """Transcribe using local whisper.cpp (requires ffmpeg + whisper binary).
+
+        Audio is piped through both processes; nothing touches the disk.
+        """
+        t_start = time.monotonic()
+
+        # Convert OGG -> 16kHz mono 16-bit PCM
+        ffmpeg_proc = await asyncio.create_subprocess_exec(
+            "ffmpeg",
+            "-i",
+            "pipe:0",
+            "-ar",
+            str(_SAMPLE_RATE),
+            "-ac",
+            "1",
+            "-f",
+            "s16le",
+            "-c:a",
+            "pcm_s16le",
+            "pipe:1",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        pcm, _ = await ffmpeg_proc.communicate(ogg_bytes)
+        if ffmpeg_proc.returncode != 0:
+            raise RuntimeError("ffmpeg conversion failed")
+
+        duration_secs = len(pcm) / (_SAMPLE_RATE * 2)
+
+        # Resolve whisper language: map display name → ISO code, "auto" → None
+        lang_setting = getattr(self.config, "preferred_language", "auto") or "auto"
+        whisper_lang: str | None = None
+        if lang_setting.lower() != "auto":
+            key = lang_setting.lower()
+            whisper_lang = _WHISPER_LANG_MAP.get(key, key)  # use as-is if already a code
+
+        # Build whisper.cpp command; "-f -" reads the WAV from stdin and the
+        # transcript is printed to stdout
+        cmd = [self.config.whisper_binary]
+        if self.config.whisper_model_path:
+            cmd += ["-m", self.config.whisper_model_path]
+        cmd += ["-f", "-", "--task", "transcribe", "-nt"]
+        # Greedy decoding on every core: voice notes are short, so beam
+        # search costs far more latency than it buys in accuracy
+        threads = self.config.whisper_threads or os.cpu_count() or 4
+        cmd += ["-t", str(threads), "-bs", "1", "-bo", "1"]
+        if not self.config.whisper_use_gpu:
+            cmd.append("-ng")
+        if whisper_lang:
+            cmd += ["-l", whisper_lang]
+
+        whisper_proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout_bytes, stderr_bytes = await whisper_proc.communicate(_wav_header(len(pcm)) + pcm)
+        if whisper_proc.returncode != 0:
+            stderr_text = (stderr_bytes or b"").decode(errors="replace").strip()
+            raise RuntimeError(
+                f"whisper.cpp exited with code {whisper_proc.returncode}"
+                + (f": {stderr_text[:200]}" if stderr_text else "")
             )
-            _, stderr_bytes = await whisper_proc.communicate()
-            if whisper_proc.returncode != 0:
-                stderr_text = (stderr_bytes or b"").decode(errors="replace").strip()
-                raise RuntimeError(
-                    f"whisper.cpp exited with code {whisper_proc.returncode}"
-                    + (f": {stderr_text[:200]}" if stderr_text else "")
-                )
-
-            # Whisper outputs <wavfile>.txt
-            txt_path = wav_path.with_suffix(".wav.txt")
-            if not txt_path.exists():
-                txt_path = wav_path.with_suffix(".txt")
-            if not txt_path.exists():
-                raise RuntimeError("Whisper output file not found after transcription")
-
-            text = txt_path.read_text(encoding="utf-8").strip()
-            elapsed = time.monotonic() - t_start
-            logger.info(
-                "Whisper transcription complete",
-                duration_secs=round(duration_secs, 2),
-                elapsed_secs=round(elapsed, 2),
-                binary=self.config.whisper_binary,
-                text_preview=text[:80],
-            )
-            return text
-
-        finally:
-            for path in [ogg_path, wav_path, txt_path]:
-                if path and path.exists():
-                    try:
-                        path.unlink()
-                    except Exception:
-                        pass
+
+        text = (stdout_bytes or b"").decode("utf-8", errors="replace").strip()
+        elapsed = time.monotonic() - t_start
+        logger.info(
+            "Whisper transcription complete",
+            duration_secs=round(duration_secs, 2),
+            elapsed_secs=round(elapsed, 2),
+            binary=self.config.whisper_binary,
+            text_preview=text[:80],
+        )
+        return text
@@ -1133,7 +1133,7 @@ async def handle_export_callback(query, export_format: str, context: ContextType
         # Send the exported file
         from io import BytesIO
 
-        file_bytes = BytesIO(exported_session.content.encode("utf-8"))
+        file_bytes = BytesIO(exported_session.content)
         file_bytes.name = exported_session.filename
 
         assert query.message is not None
@@ -1,10 +1,17 @@
 """Message handlers for non-command inputs."""
 
 import asyncio
+import codecs
+import os
+import re
+import time
+from collections.abc import Callable, Coroutine
+from functools import lru_cache
+from pathlib import Path
 from typing import Any, cast
 
 import structlog
-from telegram import Update
+from telegram import Message, Update
 from telegram.ext import ContextTypes
 
 from ...claude.exceptions import (
@@ -20,10 +27,134 @@ from ...config.settings import Settings
 from ...security.audit import AuditLogger
 from ...security.rate_limiter import RateLimiter
 from ...security.validators import SecurityValidator
+from ..utils.formatting import FormattedMessage, ResponseFormatter
 from ..utils.html_format import escape_html
 
 logger = structlog.get_logger()
 
+# Keywords that mark a request as complex; matched case-insensitively in one scan
+_COMPLEX_KEYWORDS = (
+    "analyze",
+    "generate",
+    "create",
+    "build",
+    "implement",
+    "refactor",
+    "optimize",
+    "debug",
+    "explain",
+    "document",
+)
+_COMPLEX_KEYWORDS_RE = re.compile("|".join(_COMPLEX_KEYWORDS), re.IGNORECASE)
+
+# Intent keywords for the placeholder reply, matched against whole words
+_WORD_RE = re.compile(r"[a-z]+")
+_LIST_KEYWORDS = frozenset({"list", "show", "see", "directory", "files"})
+_CREATE_KEYWORDS = frozenset({"create", "generate", "make", "build"})
+_HELP_KEYWORDS = frozenset({"help", "how", "what", "explain"})
+
+# The one placeholder reply with no per-user details
+_PLACEHOLDER_HELP_TEXT = (
+    "🤖 <b>Claude Code Response</b> <i>(Placeholder)</i>\n\n"
+    "I'm here to help! Try using /help for available commands.\n\n"
+    "<b>What I can do now:</b>\n"
+    "• Navigate directories (/cd, /ls, /pwd)\n"
+    "• Show projects (/projects)\n"
+    "• Manage sessions (/new, /status)\n\n"
+    "<b>Coming soon:</b>\n"
+    "• Full Claude Code integration\n"
+    "• Code generation and editing\n"
+    "• File operations\n"
+    "• Advanced programming assistance"
+)
+
+# Error-message keywords, tagged by category. One scan collects every category
+# present; _format_error_message then applies them in priority order.
+_ERROR_KEYWORDS_RE = re.compile(
+    r"(?P<passthrough>usage limit reached|tool not allowed)"
+    r"|(?P<no_session>no conversation found)"
+    r"|(?P<rate_limit>rate limit)"
+    r"|(?P<timeout>timeout)"
+    r"|(?P<overload>overload|capacity)"
+    r"|(?P<auth>auth|unauthorized|api key)"
+    r"|(?P<not_found>not found)"
+    r"|(?P<claude_cli>claude|cli)"
+    r"|(?P<mcp>mcp)",
+    re.IGNORECASE,
+)
+
+# Minimum spacing between progress message edits while Claude is streaming
+_PROGRESS_EDIT_INTERVAL = 1.0
+
+# Per-chat token bucket pacing multi-part replies: short bursts go out at once,
+# sustained output settles at _SEND_RATE messages per second
+_SEND_BURST = 2.0
+_SEND_RATE = 2.0
+_send_buckets: dict[int, tuple[float, float]] = {}
+# Bucket count above which refilled (idle) buckets are swept out
+_SEND_BUCKETS_MAX = 256
+
+# Strong references to fire-and-forget storage/audit writes still in flight
+_background_tasks: set[asyncio.Task[Any]] = set()
+
+# Canned replies for keyword-matched errors that carry no error details
+_ERR_NO_SESSION = (
+    "🔄 <b>Session Not Found</b>\n\n"
+    "The Claude session could not be found or has expired.\n\n"
+    "<b>What you can do:</b>\n"
+    "• Use /new to start a fresh session\n"
+    "• Try your request again\n"
+    "• Use /status to check your current session"
+)
+
+_ERR_RATE_LIMIT = (
+    "⏱️ <b>Rate Limit Reached</b>\n\n"
+    "Too many requests in a short time period.\n\n"
+    "<b>What you can do:</b>\n"
+    "• Wait a moment before trying again\n"
+    "• Use simpler requests\n"
+    "• Check your current usage with /status"
+)
+
+_ERR_TIMEOUT = (
+    "⏰ <b>Request Timeout</b>\n\n"
+    "Your request took too long to process and timed out.\n\n"
+    "<b>What you can do:</b>\n"
+    "• Try breaking down your request into smaller parts\n"
+    "• Use simpler commands\n"
+    "• Try again in a moment"
+)
+
+_ERR_OVERLOADED = (
+    "🔥 <b>Claude Overloaded</b>\n\n"
+    "Anthropic's servers are under heavy load.\n\n"
+    "<b>What you can do:</b>\n"
+    "• Wait a minute and try again\n"
+    "• Try a simpler request"
+)
+
+# Phrases in Claude's response that indicate a directory change, matched in a
+# single scan. Group 1 is the phrase, group 2 the path that follows it.
+_DIR_CHANGE_RE = re.compile(
+    r"(cd(?=\s)|changed directory to|current directory|working directory):?\s*([^\s\n]+)",
+    re.IGNORECASE,
+)
+
+# Every phrase above contains "cd" or "directory"; replies that mention neither
+# skip the full capturing regex scan
+_DIR_CHANGE_HINT = re.compile("cd|directory", re.IGNORECASE)
+
+# Precedence of each phrase when picking the new directory (lower wins)
+_DIR_CHANGE_PRIORITY = {
+    "cd": 0,  # cd command
+    "changed directory to": 1,  # explicit directory change
+    "current directory": 2,  # current directory indication
+    "working directory": 3,  # working directory indication
+}
+
+# Every progress bar state, indexed by the number of filled cells (0-10)
+_PROGRESS_BARS = tuple("█" * i + "░" * (10 - i) for i in range(11))
+
 
 def _bd(context: ContextTypes.DEFAULT_TYPE) -> dict[str, Any]:
     """Get bot_data as typed dict."""
@@ -35,69 +166,171 @@ def _ud(context: ContextTypes.DEFAULT_TYPE) -> dict[str, Any]:
     return cast(dict[str, Any], context.user_data)
 
 
-async def _format_progress_update(update_obj) -> str | None:
-    """Format progress updates with enhanced context and visual indicators."""
-    if update_obj.type == "tool_result":
-        # Show tool completion status
-        tool_name = "Unknown"
-        if update_obj.metadata and update_obj.metadata.get("tool_use_id"):
-            # Try to extract tool name from context if available
-            tool_name = update_obj.metadata.get("tool_name", "Tool")
-
-        if update_obj.is_error():
-            return f"❌ <b>{tool_name} failed</b>\n\n<i>{update_obj.get_error_message()}</i>"
-        else:
-            execution_time = ""
-            if update_obj.metadata and update_obj.metadata.get("execution_time_ms"):
-                time_ms = update_obj.metadata["execution_time_ms"]
-                execution_time = f" ({time_ms}ms)"
-            return f"✅ <b>{tool_name} completed</b>{execution_time}"
-
-    elif update_obj.type == "progress":
-        # Handle progress updates
-        progress_text = f"🔄 <b>{update_obj.content or 'Working...'}</b>"
-
-        percentage = update_obj.get_progress_percentage()
-        if percentage is not None:
-            # Create a simple progress bar
-            filled = int(percentage / 10)  # 0-10 scale
-            bar = "█" * filled + "░" * (10 - filled)
-            progress_text += f"\n\n<code>{bar}</code> {percentage}%"
-
-        if update_obj.progress:
-            step = update_obj.progress.get("step")
-            total_steps = update_obj.progress.get("total_steps")
-            if step and total_steps:
-                progress_text += f"\n\nStep {step} of {total_steps}"
-
-        return progress_text
-
-    elif update_obj.type == "error":
-        # Handle error messages
-        return f"❌ <b>Error</b>\n\n<i>{update_obj.get_error_message()}</i>"
-
-    elif update_obj.type == "assistant" and update_obj.tool_calls:
-        # Show when tools are being called
+@lru_cache(maxsize=1024)
+def _escape_error_cached(text: str) -> str:
+    return escape_html(text)
+
+
+def _escape_error(text: str) -> str:
+    """HTML-escape an error string, memoizing short ones.
+
+    The same handful of error strings recur across users; short ones are
+    served from an LRU cache, long ones are escaped directly so they never
+    pin memory in the cache.
+    """
+    if len(text) <= 512:
+        return _escape_error_cached(text)
+    return escape_html(text)
+
+
+def _spawn_background(coro: Coroutine[Any, Any, Any], what: str) -> None:
+    """Run a side-channel write (storage, audit) without holding up the reply.
+
+    The event loop only keeps weak references to tasks, so each one is parked
+    in ``_background_tasks`` until it finishes. Failures are logged, never
+    raised, matching how these writes were guarded when awaited inline.
+    """
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+
+    def _done(t: asyncio.Task[Any]) -> None:
+        _background_tasks.discard(t)
+        if not t.cancelled() and t.exception() is not None:
+            logger.warning("Background write failed", task=what, error=str(t.exception()))
+
+    task.add_done_callback(_done)
+
+
+async def drain_background_tasks() -> None:
+    """Wait for outstanding background writes; call before closing storage."""
+    while _background_tasks:
+        await asyncio.gather(*_background_tasks, return_exceptions=True)
+
+
+def _prune_send_buckets(now: float) -> None:
+    """Forget buckets that have refilled; a missing bucket starts out full."""
+    for chat_id, (tokens, last) in list(_send_buckets.items()):
+        if tokens + (now - last) * _SEND_RATE >= _SEND_BURST:
+            del _send_buckets[chat_id]
+
+
+async def _acquire_send_slot(chat_id: int) -> None:
+    """Wait until the chat's token bucket allows another message.
+
+    The token is taken up front, letting the bucket go negative, so concurrent
+    senders to the same chat queue up behind each other instead of all waking
+    at once.
+    """
+    now = time.monotonic()
+    if len(_send_buckets) > _SEND_BUCKETS_MAX:
+        _prune_send_buckets(now)
+    tokens, last = _send_buckets.get(chat_id, (_SEND_BURST, now))
+    tokens = min(_SEND_BURST, tokens + (now - last) * _SEND_RATE) - 1.0
+    _send_buckets[chat_id] = (tokens, now)
+    if tokens < 0:
+        await asyncio.sleep(-tokens / _SEND_RATE)
+
+
+async def _reply_with_chat_action(message: Message, action: str, text: str, **kwargs: Any) -> Message:
+    """Send a chat action and a reply concurrently, returning the reply.
+
+    The two requests are independent, so they share one round trip instead of
+    two. A failure in either is re-raised as-is rather than as an
+    ExceptionGroup, so callers' error messages read the same as before.
+    """
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(message.chat.send_action(action))
+            reply = tg.create_task(message.reply_text(text, **kwargs))
+    except ExceptionGroup as eg:
+        raise eg.exceptions[0] from None
+    return reply.result()
+
+
+def _format_tool_result(update_obj) -> str | None:
+    """Show tool completion status."""
+    tool_name = "Unknown"
+    if update_obj.metadata and update_obj.metadata.get("tool_use_id"):
+        # Try to extract tool name from context if available
+        tool_name = update_obj.metadata.get("tool_name", "Tool")
+
+    if update_obj.is_error():
+        return f"❌ <b>{tool_name} failed</b>\n\n<i>{update_obj.get_error_message()}</i>"
+
+    execution_time = ""
+    if update_obj.metadata and update_obj.metadata.get("execution_time_ms"):
+        time_ms = update_obj.metadata["execution_time_ms"]
+        execution_time = f" ({time_ms}ms)"
+    return f"✅ <b>{tool_name} completed</b>{execution_time}"
+
+
+def _format_progress(update_obj) -> str | None:
+    """Show a progress update with its bar and step count."""
+    progress_text = f"🔄 <b>{update_obj.content or 'Working...'}</b>"
+
+    percentage = update_obj.get_progress_percentage()
+    if percentage is not None:
+        # Look up the progress bar for this 0-10 fill level
+        bar = _PROGRESS_BARS[max(0, min(10, int(percentage / 10)))]
+        progress_text += f"\n\n<code>{bar}</code> {percentage}%"
+
+    if update_obj.progress:
+        step = update_obj.progress.get("step")
+        total_steps = update_obj.progress.get("total_steps")
+        if step and total_steps:
+            progress_text += f"\n\nStep {step} of {total_steps}"
+
+    return progress_text
+
+
+def _format_error_update(update_obj) -> str | None:
+    """Show an error reported mid-stream."""
+    return f"❌ <b>Error</b>\n\n<i>{update_obj.get_error_message()}</i>"
+
+
+def _format_assistant(update_obj) -> str | None:
+    """Show the tools being called, or a preview of Claude's text."""
+    if update_obj.tool_calls:
         tool_names = update_obj.get_tool_names()
         if tool_names:
-            tools_text = ", ".join(tool_names)
-            return f"🔧 <b>Using tools:</b> {tools_text}"
+            return f"🔧 <b>Using tools:</b> {', '.join(tool_names)}"
+        return None
 
-    elif update_obj.type == "assistant" and update_obj.content:
-        # Regular content updates with preview
-        content_preview = update_obj.content[:150] + "..." if len(update_obj.content) > 150 else update_obj.content
-        return f"🤖 <b>Claude is working...</b>\n\n<i>{content_preview}</i>"
+    if update_obj.content:
+        # Slicing one past the limit tells us whether anything was cut without
+        # measuring the whole chunk
+        head = update_obj.content[:151]
+        ellipsis = "..." if len(head) > 150 else ""
+        return f"🤖 <b>Claude is working...</b>\n\n<i>{head[:150]}{ellipsis}</i>"
+
+    return None
 
-    elif update_obj.type == "system":
-        # System initialization or other system messages
-        if update_obj.metadata and update_obj.metadata.get("subtype") == "init":
-            tools_count = len(update_obj.metadata.get("tools", []))
-            model = update_obj.metadata.get("model", "Claude")
-            return f"🚀 <b>Starting {model}</b> with {tools_count} tools available"
 
+def _format_system(update_obj) -> str | None:
+    """Show system initialization messages."""
+    if update_obj.metadata and update_obj.metadata.get("subtype") == "init":
+        tools_count = len(update_obj.metadata.get("tools", []))
+        model = update_obj.metadata.get("model", "Claude")
+        return f"🚀 <b>Starting {model}</b> with {tools_count} tools available"
     return None
 
 
+# Stream update type -> formatter; one lookup per streamed event
+_PROGRESS_FORMATTERS: dict[str, Callable[[Any], str | None]] = {
+    "tool_result": _format_tool_result,
+    "progress": _format_progress,
+    "error": _format_error_update,
+    "assistant": _format_assistant,
+    "system": _format_system,
+}
+
+
+async def _format_progress_update(update_obj) -> str | None:
+    """Format progress updates with enhanced context and visual indicators."""
+    formatter = _PROGRESS_FORMATTERS.get(update_obj.type)
+    return formatter(update_obj) if formatter else None
+
+
 def _format_error_message(error: Exception | str) -> str:
     """Format error messages for user-friendly display.
 
@@ -117,7 +350,7 @@ def _format_error_message(error: Exception | str) -> str:
     if isinstance(error_obj, ClaudeTimeoutError):
         return (
             "⏰ <b>Request Timeout</b>\n\n"
-            f"{escape_html(error_str)}\n\n"
+            f"{_escape_error(error_str)}\n\n"
             "<b>What you can do:</b>\n"
             "• Try breaking your request into smaller parts\n"
             "• Avoid asking for very large file operations in one go\n"
@@ -130,7 +363,7 @@ def _format_error_message(error: Exception | str) -> str:
             server_hint = f" (<code>{escape_html(error_obj.server_name)}</code>)"
         return (
             f"🔌 <b>MCP Server Error</b>{server_hint}\n\n"
-            f"{escape_html(error_str)}\n\n"
+            f"{_escape_error(error_str)}\n\n"
             "<b>What you can do:</b>\n"
             "• Check that the MCP server is running and reachable\n"
             "• Verify <code>MCP_CONFIG_PATH</code> points to a valid config\n"
@@ -141,7 +374,7 @@ def _format_error_message(error: Exception | str) -> str:
         return (
             "📄 <b>Response Parsing Error</b>\n\n"
             "Claude returned a response that could not be parsed:\n"
-            f"<code>{escape_html(error_str[:300])}</code>\n\n"
+            f"<code>{_escape_error(error_str[:300])}</code>\n\n"
             "<b>What you can do:</b>\n"
             "• Try your request again\n"
             "• Rephrase your prompt if the problem persists"
@@ -150,7 +383,7 @@ def _format_error_message(error: Exception | str) -> str:
     if isinstance(error_obj, ClaudeSessionError):
         return (
             "🔄 <b>Session Error</b>\n\n"
-            f"{escape_html(error_str)}\n\n"
+            f"{_escape_error(error_str)}\n\n"
             "<b>What you can do:</b>\n"
             "• Use /new to start a fresh session\n"
             "• Try your request again\n"
@@ -162,72 +395,45 @@ def _format_error_message(error: Exception | str) -> str:
 
     # --- Fall back to keyword matching (for string-only callers) ---
 
-    error_lower = error_str.lower()
+    found = {m.lastgroup for m in _ERROR_KEYWORDS_RE.finditer(error_str)}
 
-    if "usage limit reached" in error_lower or "tool not allowed" in error_lower:
+    if "passthrough" in found:
         return error_str
 
-    if "no conversation found" in error_lower:
-        return (
-            "🔄 <b>Session Not Found</b>\n\n"
-            "The Claude session could not be found or has expired.\n\n"
-            "<b>What you can do:</b>\n"
-            "• Use /new to start a fresh session\n"
-            "• Try your request again\n"
-            "• Use /status to check your current session"
-        )
+    if "no_session" in found:
+        return _ERR_NO_SESSION
 
-    if "rate limit" in error_lower:
-        return (
-            "⏱️ <b>Rate Limit Reached</b>\n\n"
-            "Too many requests in a short time period.\n\n"
-            "<b>What you can do:</b>\n"
-            "• Wait a moment before trying again\n"
-            "• Use simpler requests\n"
-            "• Check your current usage with /status"
-        )
+    if "rate_limit" in found:
+        return _ERR_RATE_LIMIT
 
-    if "timeout" in error_lower:
-        return (
-            "⏰ <b>Request Timeout</b>\n\n"
-            "Your request took too long to process and timed out.\n\n"
-            "<b>What you can do:</b>\n"
-            "• Try breaking down your request into smaller parts\n"
-            "• Use simpler commands\n"
-            "• Try again in a moment"
-        )
+    if "timeout" in found:
+        return _ERR_TIMEOUT
 
-    if "overload" in error_lower or "capacity" in error_lower:
-        return (
-            "🔥 <b>Claude Overloaded</b>\n\n"
-            "Anthropic's servers are under heavy load.\n\n"
-            "<b>What you can do:</b>\n"
-            "• Wait a minute and try again\n"
-            "• Try a simpler request"
-        )
+    if "overload" in found:
+        return _ERR_OVERLOADED
 
-    if "auth" in error_lower or "unauthorized" in error_lower or "api key" in error_lower:
+    if "auth" in found:
         return (
             "🔑 <b>Authentication Error</b>\n\n"
-            f"{escape_html(error_str)}\n\n"
+            f"{_escape_error(error_str)}\n\n"
             "<b>What you can do:</b>\n"
             "• Ask the administrator to check the <code>ANTHROPIC_API_KEY</code>"
         )
 
-    if "not found" in error_lower and ("claude" in error_lower or "cli" in error_lower):
+    if "not_found" in found and "claude_cli" in found:
         return (
             "🔍 <b>Claude CLI Not Found</b>\n\n"
-            f"{escape_html(error_str)}\n\n"
+            f"{_escape_error(error_str)}\n\n"
             "<b>What you can do:</b>\n"
             "• Ensure Claude Code is installed: "
             "<code>npm install -g @anthropic-ai/claude-code</code>\n"
             "• Set the <code>CLAUDE_CLI_PATH</code> environment variable"
         )
 
-    if "mcp" in error_lower:
+    if "mcp" in found:
         return (
             "🔌 <b>MCP Server Error</b>\n\n"
-            f"{escape_html(error_str)}\n\n"
+            f"{_escape_error(error_str)}\n\n"
             "<b>What you can do:</b>\n"
             "• Check that the MCP server is running\n"
             "• Verify MCP configuration\n"
@@ -238,7 +444,7 @@ def _format_error_message(error: Exception | str) -> str:
         return _format_process_error(error_str)
 
     # --- Truly unknown errors ---
-    safe_error = escape_html(error_str)
+    safe_error = _escape_error(error_str)
     if len(safe_error) > 500:
         safe_error = safe_error[:500] + "..."
 
@@ -247,7 +453,7 @@ def _format_error_message(error: Exception | str) -> str:
 
 def _format_process_error(error_str: str) -> str:
     """Format a Claude process/SDK error with actual details."""
-    safe_error = escape_html(error_str)
+    safe_error = _escape_error(error_str)
     if len(safe_error) > 500:
         safe_error = safe_error[:500] + "..."
 
@@ -263,18 +469,26 @@ def _format_process_error(error_str: str) -> str:
 
 async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle regular text messages as Claude prompts."""
-    assert update.effective_user is not None
+    user = update.effective_user
+    assert user is not None
     assert update.message is not None
-    user_id = update.effective_user.id
+    user_id = user.id
+    msg_id = update.message.message_id
+    chat_id = update.message.chat_id
     message_text = update.message.text or ""
-    settings: Settings = _bd(context)["settings"]
+    bd = _bd(context)
+    ud = _ud(context)
+    settings: Settings = bd["settings"]
 
     # Get services
-    rate_limiter: RateLimiter | None = _bd(context).get("rate_limiter")
-    audit_logger: AuditLogger | None = _bd(context).get("audit_logger")
+    rate_limiter: RateLimiter | None = bd.get("rate_limiter")
+    audit_logger: AuditLogger | None = bd.get("audit_logger")
 
     logger.info("Processing text message", user_id=user_id, message_length=len(message_text))
 
+    # Set once the progress message has been turned into the first reply chunk
+    progress_msg_is_reply = False
+
     try:
         # Check rate limit with estimated cost for text processing
         estimated_cost = _estimate_text_processing_cost(message_text)
@@ -285,18 +499,17 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
                 await update.message.reply_text(f"⏱️ {limit_message}")
                 return
 
-        # Send typing indicator
-        await update.message.chat.send_action("typing")
-
-        # Create progress message
-        progress_msg = await update.message.reply_text(
+        # Send typing indicator and create progress message
+        progress_msg = await _reply_with_chat_action(
+            update.message,
+            "typing",
             "🤔 Processing your request...",
-            reply_to_message_id=update.message.message_id,
+            reply_to_message_id=msg_id,
         )
 
         # Get Claude integration and storage from context
-        claude_integration = _bd(context).get("claude_integration")
-        storage = _bd(context).get("storage")
+        claude_integration = bd.get("claude_integration")
+        storage = bd.get("storage")
 
         if not claude_integration:
             await update.message.reply_text(
@@ -308,21 +521,34 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
             return
 
         # Get current directory
-        current_dir = _ud(context).get("current_directory", settings.approved_directory)
+        current_dir = ud.get("current_directory", settings.approved_directory)
 
         # Get existing session ID
-        session_id = _ud(context).get("claude_session_id")
+        session_id = ud.get("claude_session_id")
 
         # Check if /new was used — skip auto-resume for this first message.
         # Flag is only cleared after a successful run so retries keep the intent.
-        force_new = bool(_ud(context).get("force_new_session"))
+        force_new = bool(ud.get("force_new_session"))
+
+        # Enhanced stream updates handler with progress tracking. Edits are
+        # coalesced: unchanged text is never re-sent and, errors aside, at most
+        # one edit goes out per _PROGRESS_EDIT_INTERVAL to stay clear of
+        # Telegram's per-chat edit limits.
+        last_edit_time = 0.0
+        last_progress_text = ""
 
-        # Enhanced stream updates handler with progress tracking
         async def stream_handler(update_obj):
+            nonlocal last_edit_time, last_progress_text
             try:
                 progress_text = await _format_progress_update(update_obj)
-                if progress_text:
-                    await progress_msg.edit_text(progress_text, parse_mode="HTML")
+                if not progress_text or progress_text == last_progress_text:
+                    return
+                now = time.monotonic()
+                if update_obj.type != "error" and now - last_edit_time < _PROGRESS_EDIT_INTERVAL:
+                    return
+                last_edit_time = now
+                last_progress_text = progress_text
+                await progress_msg.edit_text(progress_text, parse_mode="HTML")
             except Exception as e:
                 logger.warning("Failed to update progress message", error=str(e))
 
@@ -339,30 +565,29 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
 
             # New session created successfully — clear the one-shot flag
             if force_new:
-                _ud(context)["force_new_session"] = False
+                ud["force_new_session"] = False
 
             # Update session ID
-            _ud(context)["claude_session_id"] = claude_response.session_id
+            ud["claude_session_id"] = claude_response.session_id
 
             # Check if Claude changed the working directory and update our tracking
             _update_working_directory_from_claude_response(claude_response, context, settings, user_id)
 
-            # Log interaction to storage
+            # Log interaction to storage in the background; the reply doesn't
+            # depend on it
             if storage:
-                try:
-                    await storage.save_claude_interaction(
+                _spawn_background(
+                    storage.save_claude_interaction(
                         user_id=user_id,
                         session_id=claude_response.session_id,
                         prompt=message_text,
                         response=claude_response,
                         ip_address=None,  # Telegram doesn't provide IP
-                    )
-                except Exception as e:
-                    logger.warning("Failed to log interaction to storage", error=str(e))
+                    ),
+                    "save_claude_interaction",
+                )
 
             # Format response
-            from ..utils.formatting import ResponseFormatter
-
             formatter = ResponseFormatter(settings)
             formatted_messages = formatter.format_claude_response(claude_response.content)
 
@@ -375,33 +600,37 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
                 blocked_tools=e.blocked_tools,
             )
             # Error message already formatted, create FormattedMessage
-            from ..utils.formatting import FormattedMessage
-
             formatted_messages = [FormattedMessage(str(e), parse_mode="HTML")]
         except Exception as e:
             logger.error("Claude integration failed", error=str(e), user_id=user_id)
             # Format error and create FormattedMessage
-            from ..utils.formatting import FormattedMessage
-
             formatted_messages = [FormattedMessage(_format_error_message(e), parse_mode="HTML")]
 
-        # Delete progress message
-        await progress_msg.delete()
+        # The progress message already replies to the user's message, so the
+        # first chunk is edited into it; a fresh send is only needed if that fails
+        first_unsent = 0
+        try:
+            head = formatted_messages[0]
+            await progress_msg.edit_text(head.text, parse_mode=head.parse_mode, reply_markup=head.reply_markup)
+            first_unsent = 1
+            progress_msg_is_reply = True
+        except Exception as e:
+            logger.debug("Could not edit response into progress message", error=str(e))
+            await progress_msg.delete()
 
-        # Send formatted responses (may be multiple messages)
-        for i, message in enumerate(formatted_messages):
+        # Send the remaining formatted responses (may be multiple messages);
+        # only the very first message replies to the user's message
+        reply_to = msg_id if first_unsent == 0 else None
+        for i, message in enumerate(formatted_messages[first_unsent:], start=first_unsent):
             try:
+                await _acquire_send_slot(chat_id)
                 await update.message.reply_text(
                     message.text,
                     parse_mode=message.parse_mode,
                     reply_markup=message.reply_markup,
-                    reply_to_message_id=update.message.message_id if i == 0 else None,
+                    reply_to_message_id=reply_to,
                 )
 
-                # Small delay between messages to avoid rate limits
-                if i < len(formatted_messages) - 1:
-                    await asyncio.sleep(0.5)
-
             except Exception as e:
                 logger.warning(
                     "Failed to send HTML response, retrying as plain text",
@@ -412,19 +641,33 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
                     await update.message.reply_text(
                         message.text,
                         reply_markup=message.reply_markup,
-                        reply_to_message_id=(update.message.message_id if i == 0 else None),
+                        reply_to_message_id=reply_to,
                     )
                 except Exception:
                     await update.message.reply_text(
                         "❌ Failed to send response. Please try again.",
-                        reply_to_message_id=(update.message.message_id if i == 0 else None),
+                        reply_to_message_id=reply_to,
                     )
+            reply_to = None
 
         # Update session info
-        _ud(context)["last_message"] = update.message.text
+        ud["last_message"] = update.message.text
+
+        # Log successful message processing; the write runs alongside the
+        # conversation enhancer below rather than after it
+        if audit_logger:
+            _spawn_background(
+                audit_logger.log_command(
+                    user_id=user_id,
+                    command="text_message",
+                    args=[(update.message.text or "")[:100]],  # First 100 chars
+                    success=True,
+                ),
+                "log_command",
+            )
 
         # Add conversation enhancements if available
-        features = _bd(context).get("features")
+        features = bd.get("features")
         conversation_enhancer = features.get_conversation_enhancer() if features else None
 
         if conversation_enhancer and claude_response:
@@ -463,34 +706,29 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
             except Exception as e:
                 logger.warning("Conversation enhancement failed", error=str(e), user_id=user_id)
 
-        # Log successful message processing
-        if audit_logger:
-            await audit_logger.log_command(
-                user_id=user_id,
-                command="text_message",
-                args=[(update.message.text or "")[:100]],  # First 100 chars
-                success=True,
-            )
-
         logger.info("Text message processed successfully", user_id=user_id)
 
     except Exception as e:
-        # Clean up progress message if it exists
-        try:
-            await progress_msg.delete()
-        except Exception:
-            pass
+        # Clean up progress message if it exists and isn't carrying the reply
+        if not progress_msg_is_reply:
+            try:
+                await progress_msg.delete()
+            except Exception:
+                pass
 
-        error_msg = f"❌ <b>Error processing message</b>\n\n{escape_html(str(e))}"
+        error_msg = f"❌ <b>Error processing message</b>\n\n{_escape_error(str(e))}"
         await update.message.reply_text(error_msg, parse_mode="HTML")
 
         # Log failed processing
         if audit_logger:
-            await audit_logger.log_command(
-                user_id=user_id,
-                command="text_message",
-                args=[(update.message.text or "")[:100]],
-                success=False,
+            _spawn_background(
+                audit_logger.log_command(
+                    user_id=user_id,
+                    command="text_message",
+                    args=[(update.message.text or "")[:100]],
+                    success=False,
+                ),
+                "log_command",
             )
 
         logger.error("Error processing text message", error=str(e), user_id=user_id)
@@ -498,17 +736,22 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
 
 async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle file uploads."""
-    assert update.effective_user is not None
+    user = update.effective_user
+    assert user is not None
     assert update.message is not None
     assert update.message.document is not None
-    user_id = update.effective_user.id
+    user_id = user.id
+    msg_id = update.message.message_id
+    chat_id = update.message.chat_id
     document = update.message.document
-    settings: Settings = _bd(context)["settings"]
+    bd = _bd(context)
+    ud = _ud(context)
+    settings: Settings = bd["settings"]
 
     # Get services
-    security_validator: SecurityValidator | None = _bd(context).get("security_validator")
-    audit_logger: AuditLogger | None = _bd(context).get("audit_logger")
-    rate_limiter: RateLimiter | None = _bd(context).get("rate_limiter")
+    security_validator: SecurityValidator | None = bd.get("security_validator")
+    audit_logger: AuditLogger | None = bd.get("audit_logger")
+    rate_limiter: RateLimiter | None = bd.get("rate_limiter")
 
     logger.info(
         "Processing document upload",
@@ -557,16 +800,16 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
                 await update.message.reply_text(f"⏱️ {limit_message}")
                 return
 
-        # Send processing indicator
-        await update.message.chat.send_action("upload_document")
-
-        progress_msg = await update.message.reply_text(
+        # Send processing indicator and create progress message
+        progress_msg = await _reply_with_chat_action(
+            update.message,
+            "upload_document",
             f"📄 Processing file: <code>{document.file_name}</code>...",
             parse_mode="HTML",
         )
 
         # Check if enhanced file handler is available
-        features = _bd(context).get("features")
+        features = bd.get("features")
         file_handler = features.get_file_handler() if features else None
 
         if file_handler:
@@ -597,20 +840,31 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             file = await document.get_file()
             file_bytes = await file.download_as_bytearray()
 
-            # Try to decode as text
-            try:
-                content = file_bytes.decode("utf-8")
-
-                # Check content length
+            # A NUL byte near the start means a binary file; reject it before
+            # paying for any decoding.
+            content: str | None = None
+            truncation_note = ""
+            if file_bytes.find(b"\x00", 0, 4096) == -1:
+                # Try to decode as text. Only the prefix that can fit in the
+                # content budget is decoded (UTF-8 is at most 4 bytes per char);
+                # the incremental decoder keeps a multi-byte char split by the
+                # cut from raising.
                 max_content_length = 50000  # 50KB of text
-                if len(content) > max_content_length:
-                    content = content[:max_content_length] + "\n... (file truncated for processing)"
+                head_size = max_content_length * 4 + 3
+                is_partial = len(file_bytes) > head_size
+                decoder = codecs.getincrementaldecoder("utf-8")()
+                try:
+                    content = decoder.decode(memoryview(file_bytes)[:head_size], final=not is_partial)
+                except UnicodeDecodeError:
+                    pass
 
-                # Create prompt with file content
-                caption = update.message.caption or "Please review this file:"
-                prompt = f"{caption}\n\n**File:** `{document.file_name}`\n\n```\n{content}\n```"
+                # Check content length; the note is appended when the prompt is
+                # built so the text is not copied an extra time here
+                if content is not None and (is_partial or len(content) > max_content_length):
+                    content = content[:max_content_length]
+                    truncation_note = "\n... (file truncated for processing)"
 
-            except UnicodeDecodeError:
+            if content is None:
                 await progress_msg.edit_text(
                     "❌ <b>File Format Not Supported</b>\n\n"
                     "File must be text-based and UTF-8 encoded.\n\n"
@@ -623,14 +877,16 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
                 )
                 return
 
-        # Delete progress message
-        await progress_msg.delete()
+            # Create prompt with file content in one formatting pass
+            caption = update.message.caption or "Please review this file:"
+            prompt = f"{caption}\n\n**File:** `{document.file_name}`\n\n```\n{content}{truncation_note}\n```"
 
-        # Create a new progress message for Claude processing
-        claude_progress_msg = await update.message.reply_text("🤖 Processing file with Claude...", parse_mode="HTML")
+        # Reuse the progress message for Claude processing
+        await progress_msg.edit_text("🤖 Processing file with Claude...", parse_mode="HTML")
+        claude_progress_msg = progress_msg
 
         # Get Claude integration from context
-        claude_integration = _bd(context).get("claude_integration")
+        claude_integration = bd.get("claude_integration")
 
         if not claude_integration:
             await claude_progress_msg.edit_text(
@@ -640,8 +896,8 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             return
 
         # Get current directory and session
-        current_dir = _ud(context).get("current_directory", settings.approved_directory)
-        session_id = _ud(context).get("claude_session_id")
+        current_dir = ud.get("current_directory", settings.approved_directory)
+        session_id = ud.get("claude_session_id")
 
         # Process with Claude
         try:
@@ -653,31 +909,29 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             )
 
             # Update session ID
-            _ud(context)["claude_session_id"] = claude_response.session_id
+            ud["claude_session_id"] = claude_response.session_id
 
             # Check if Claude changed the working directory and update our tracking
             _update_working_directory_from_claude_response(claude_response, context, settings, user_id)
 
             # Format and send response
-            from ..utils.formatting import ResponseFormatter
-
             formatter = ResponseFormatter(settings)
             formatted_messages = formatter.format_claude_response(claude_response.content)
 
             # Delete progress message
             await claude_progress_msg.delete()
 
-            # Send responses
-            for i, message in enumerate(formatted_messages):
+            # Send responses; only the first replies to the user's upload
+            reply_to: int | None = msg_id
+            for message in formatted_messages:
+                await _acquire_send_slot(chat_id)
                 await update.message.reply_text(
                     message.text,
                     parse_mode=message.parse_mode,
                     reply_markup=message.reply_markup,
-                    reply_to_message_id=(update.message.message_id if i == 0 else None),
+                    reply_to_message_id=reply_to,
                 )
-
-                if i < len(formatted_messages) - 1:
-                    await asyncio.sleep(0.5)
+                reply_to = None
 
         except Exception as e:
             await claude_progress_msg.edit_text(_format_error_message(e), parse_mode="HTML")
@@ -685,12 +939,15 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
         # Log successful file processing
         if audit_logger:
-            await audit_logger.log_file_access(
-                user_id=user_id,
-                file_path=document.file_name,
-                action="upload_processed",
-                success=True,
-                file_size=document.file_size,
+            _spawn_background(
+                audit_logger.log_file_access(
+                    user_id=user_id,
+                    file_path=document.file_name,
+                    action="upload_processed",
+                    success=True,
+                    file_size=document.file_size,
+                ),
+                "log_file_access",
             )
 
     except Exception as e:
@@ -699,17 +956,20 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         except Exception:
             pass
 
-        error_msg = f"❌ <b>Error processing file</b>\n\n{escape_html(str(e))}"
+        error_msg = f"❌ <b>Error processing file</b>\n\n{_escape_error(str(e))}"
         await update.message.reply_text(error_msg, parse_mode="HTML")
 
         # Log failed file processing
         if audit_logger:
-            await audit_logger.log_file_access(
-                user_id=user_id,
-                file_path=document.file_name,
-                action="upload_failed",
-                success=False,
-                file_size=document.file_size,
+            _spawn_background(
+                audit_logger.log_file_access(
+                    user_id=user_id,
+                    file_path=document.file_name,
+                    action="upload_failed",
+                    success=False,
+                    file_size=document.file_size,
+                ),
+                "log_file_access",
             )
 
         logger.error("Error processing document", error=str(e), user_id=user_id)
@@ -717,13 +977,18 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
 async def handle_photo(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle photo uploads."""
-    assert update.effective_user is not None
+    user = update.effective_user
+    assert user is not None
     assert update.message is not None
-    user_id = update.effective_user.id
-    settings: Settings = _bd(context)["settings"]
+    user_id = user.id
+    msg_id = update.message.message_id
+    chat_id = update.message.chat_id
+    bd = _bd(context)
+    ud = _ud(context)
+    settings: Settings = bd["settings"]
 
     # Check if enhanced image handler is available
-    features = _bd(context).get("features")
+    features = bd.get("features")
     image_handler = features.get_image_handler() if features else None
 
     if image_handler:
@@ -737,16 +1002,12 @@ async def handle_photo(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
             # Process image with enhanced handler
             processed_image = await image_handler.process_image(photo, update.message.caption)
 
-            # Delete progress message
-            await progress_msg.delete()
-
-            # Create Claude progress message
-            claude_progress_msg = await update.message.reply_text(
-                "🤖 Analyzing image with Claude...", parse_mode="HTML"
-            )
+            # Reuse the progress message for Claude processing
+            await progress_msg.edit_text("🤖 Analyzing image with Claude...", parse_mode="HTML")
+            claude_progress_msg = progress_msg
 
             # Get Claude integration
-            claude_integration = _bd(context).get("claude_integration")
+            claude_integration = bd.get("claude_integration")
 
             if not claude_integration:
                 await claude_progress_msg.edit_text(
@@ -757,8 +1018,8 @@ async def handle_photo(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
                 return
 
             # Get current directory and session
-            current_dir = _ud(context).get("current_directory", settings.approved_directory)
-            session_id = _ud(context).get("claude_session_id")
+            current_dir = ud.get("current_directory", settings.approved_directory)
+            session_id = ud.get("claude_session_id")
 
             # Process with Claude
             try:
@@ -770,28 +1031,26 @@ async def handle_photo(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
                 )
 
                 # Update session ID
-                _ud(context)["claude_session_id"] = claude_response.session_id
+                ud["claude_session_id"] = claude_response.session_id
 
                 # Format and send response
-                from ..utils.formatting import ResponseFormatter
-
                 formatter = ResponseFormatter(settings)
                 formatted_messages = formatter.format_claude_response(claude_response.content)
 
                 # Delete progress message
                 await claude_progress_msg.delete()
 
-                # Send responses
-                for i, message in enumerate(formatted_messages):
+                # Send responses; only the first replies to the user's upload
+                reply_to: int | None = msg_id
+                for message in formatted_messages:
+                    await _acquire_send_slot(chat_id)
                     await update.message.reply_text(
                         message.text,
                         parse_mode=message.parse_mode,
                         reply_markup=message.reply_markup,
-                        reply_to_message_id=(update.message.message_id if i == 0 else None),
+                        reply_to_message_id=reply_to,
                     )
-
-                    if i < len(formatted_messages) - 1:
-                        await asyncio.sleep(0.5)
+                    reply_to = None
 
             except Exception as e:
                 await claude_progress_msg.edit_text(_format_error_message(e), parse_mode="HTML")
@@ -800,7 +1059,7 @@ async def handle_photo(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         except Exception as e:
             logger.error("Image processing failed", error=str(e), user_id=user_id)
             await update.message.reply_text(
-                f"❌ <b>Error processing image</b>\n\n{escape_html(str(e))}",
+                f"❌ <b>Error processing image</b>\n\n{_escape_error(str(e))}",
                 parse_mode="HTML",
             )
     else:
@@ -828,26 +1087,14 @@ def _estimate_text_processing_cost(text: str) -> float:
     # Additional cost based on length
     length_cost = len(text) * 0.00001
 
-    # Additional cost for complex requests
-    complex_keywords = [
-        "analyze",
-        "generate",
-        "create",
-        "build",
-        "implement",
-        "refactor",
-        "optimize",
-        "debug",
-        "explain",
-        "document",
-    ]
-
-    text_lower = text.lower()
-    complexity_multiplier = 1.0
-
-    for keyword in complex_keywords:
-        if keyword in text_lower:
-            complexity_multiplier += 0.5
+    # Additional cost for complex requests: +0.5 per distinct keyword, capped
+    # at 3.0, so stop scanning once four distinct keywords have been seen
+    seen: set[str] = set()
+    for match in _COMPLEX_KEYWORDS_RE.finditer(text):
+        seen.add(match.group().lower())
+        if len(seen) >= 4:
+            break
+    complexity_multiplier = 1.0 + 0.5 * len(seen)
 
     return (base_cost + length_cost) * min(complexity_multiplier, 3.0)
 
@@ -869,10 +1116,10 @@ async def _generate_placeholder_response(message_text: str, context: ContextType
     current_dir = _ud(context).get("current_directory", settings.approved_directory)
     relative_path = current_dir.relative_to(settings.approved_directory)
 
-    # Analyze the message for intent
-    message_lower = message_text.lower()
+    # Analyze the message for intent; one tokenizing pass, then set lookups
+    words = set(_WORD_RE.findall(message_text.lower()))
 
-    if any(word in message_lower for word in ["list", "show", "see", "directory", "files"]):
+    if not words.isdisjoint(_LIST_KEYWORDS):
         response_text = (
             f"🤖 <b>Claude Code Response</b> <i>(Placeholder)</i>\n\n"
             f"I understand you want to see files. Try using the /ls command to list files "
@@ -884,7 +1131,7 @@ async def _generate_placeholder_response(message_text: str, context: ContextType
             f"<i>Note: Full Claude Code integration will be available in the next phase.</i>"
         )
 
-    elif any(word in message_lower for word in ["create", "generate", "make", "build"]):
+    elif not words.isdisjoint(_CREATE_KEYWORDS):
         response_text = (
             f"🤖 <b>Claude Code Response</b> <i>(Placeholder)</i>\n\n"
             f"I understand you want to create something! Once the Claude Code integration "
@@ -897,20 +1144,8 @@ async def _generate_placeholder_response(message_text: str, context: ContextType
             f"<i>Full functionality coming soon!</i>"
         )
 
-    elif any(word in message_lower for word in ["help", "how", "what", "explain"]):
-        response_text = (
-            "🤖 <b>Claude Code Response</b> <i>(Placeholder)</i>\n\n"
-            "I'm here to help! Try using /help for available commands.\n\n"
-            "<b>What I can do now:</b>\n"
-            "• Navigate directories (/cd, /ls, /pwd)\n"
-            "• Show projects (/projects)\n"
-            "• Manage sessions (/new, /status)\n\n"
-            "<b>Coming soon:</b>\n"
-            "• Full Claude Code integration\n"
-            "• Code generation and editing\n"
-            "• File operations\n"
-            "• Advanced programming assistance"
-        )
+    elif not words.isdisjoint(_HELP_KEYWORDS):
+        response_text = _PLACEHOLDER_HELP_TEXT
 
     else:
         response_text = (
@@ -928,52 +1163,75 @@ async def _generate_placeholder_response(message_text: str, context: ContextType
     return {"text": response_text, "parse_mode": "HTML"}
 
 
+@lru_cache(maxsize=8)
+def _approved_dir_strings(approved_directory: Path) -> tuple[str, str]:
+    """Return the approved directory as a string and as a separator-ended prefix.
+
+    approved_directory is already resolved by its settings validator, so
+    containment is a plain string test; the trailing separator stops /srv/app
+    from matching /srv/apple. Computed once per distinct directory.
+    """
+    approved = str(approved_directory)
+    return approved, os.path.join(approved, "")
+
+
 def _update_working_directory_from_claude_response(claude_response, context, settings, user_id):
     """Update the working directory based on Claude's response content."""
-    import re
-    from pathlib import Path
-
-    # Look for directory changes in Claude's response
-    # This searches for common patterns that indicate directory changes
-    patterns = [
-        r"(?:^|\n).*?cd\s+([^\s\n]+)",  # cd command
-        r"(?:^|\n).*?Changed directory to:?\s*([^\s\n]+)",  # explicit directory change
-        r"(?:^|\n).*?Current directory:?\s*([^\s\n]+)",  # current directory indication
-        r"(?:^|\n).*?Working directory:?\s*([^\s\n]+)",  # working directory indication
-    ]
-
-    content = claude_response.content.lower()
-    current_dir = _ud(context).get("current_directory", settings.approved_directory)
-
-    for pattern in patterns:
-        matches = re.findall(pattern, content, re.MULTILINE | re.IGNORECASE)
-        for match in matches:
-            try:
-                # Clean up the path
-                new_path = match.strip().strip("\"'`")
-
-                # Handle relative paths
-                if new_path.startswith("./") or new_path.startswith("../"):
-                    new_path = (current_dir / new_path).resolve()
-                elif not new_path.startswith("/"):
-                    # Relative path without ./
-                    new_path = (current_dir / new_path).resolve()
-                else:
-                    # Absolute path
-                    new_path = Path(new_path).resolve()
-
-                # Validate that the new path is within the approved directory
-                if new_path.is_relative_to(settings.approved_directory) and new_path.exists():
-                    _ud(context)["current_directory"] = new_path
-                    logger.info(
-                        "Updated working directory from Claude response",
-                        old_dir=str(current_dir),
-                        new_dir=str(new_path),
-                        user_id=user_id,
-                    )
-                    return  # Take the first valid match
+    # Match case-insensitively on the original text: lowercasing a copy would
+    # also lowercase the captured paths, which breaks mixed-case directories
+    content = claude_response.content
+    if not _DIR_CHANGE_HINT.search(content):
+        return
+
+    ud = _ud(context)
+    current_dir = ud.get("current_directory", settings.approved_directory)
+
+    approved, approved_prefix = _approved_dir_strings(settings.approved_directory)
+
+    # One pass over the response; a stable sort then restores the phrase
+    # precedence, keeping text order within each phrase
+    found = sorted(
+        _DIR_CHANGE_RE.finditer(content),
+        key=lambda m: _DIR_CHANGE_PRIORITY[m.group(1).lower()],
+    )
 
-            except (ValueError, OSError) as e:
-                # Invalid path, skip this match
-                logger.debug("Invalid path in Claude response", path=match, error=str(e))
-                continue
+    # Clean up the paths and drop repeats (keeping first-seen order), so a
+    # directory Claude mentions several times is only checked on disk once
+    candidates = dict.fromkeys(m.group(2).strip().strip("\"'`") for m in found)
+
+    for new_path in candidates:
+        # Reject strings no filesystem call could accept up front, rather than
+        # letting them raise; 4096 is PATH_MAX on Linux
+        if not new_path or "\x00" in new_path or len(new_path) > 4096:
+            continue
+
+        # Relative paths (with or without ./ or ../) are taken from the
+        # current directory; os.path.join leaves absolute paths as they are.
+        # A purely lexical check first throws out paths that are plainly
+        # outside the approved directory without a single syscall.
+        joined = os.path.join(current_dir, new_path)
+        normalized = os.path.normpath(joined)
+        if not (normalized == approved or normalized.startswith(approved_prefix)):
+            continue
+
+        # realpath is still needed for the real check: it resolves symlinks,
+        # so a link inside the tree that points outside it is caught below
+        try:
+            resolved = os.path.realpath(joined)
+        except (ValueError, OSError) as e:
+            # Invalid path, skip this match
+            logger.debug("Invalid path in Claude response", path=new_path, error=str(e))
+            continue
+
+        # Validate that the new path is a directory within the approved
+        # directory; the string test runs first so only contained paths cost
+        # a stat
+        if (resolved == approved or resolved.startswith(approved_prefix)) and os.path.isdir(resolved):
+            ud["current_directory"] = Path(resolved)
+            logger.info(
+                "Updated working directory from Claude response",
+                old_dir=str(current_dir),
+                new_dir=resolved,
+                user_id=user_id,
+            )
+            return  # Take the first valid match
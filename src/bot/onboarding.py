@@ -91,30 +91,84 @@ def _s(context: ContextTypes.DEFAULT_TYPE) -> Settings:
 
 
 # ── Keyboard builders ─────────────────────────────────────────────────────────
+#
+# PTB buttons and markups are immutable once built, so everything static is
+# built once at import and shared between renders; only the buttons whose
+# label depends on the user's choices are created per call.
+
+_SKIP_ROW = (InlineKeyboardButton("Skip wizard", callback_data="wiz:skip"),)
+
+_WORKSPACE_STATIC_ROWS = (
+    (
+        InlineKeyboardButton("~/projects", callback_data="wiz:ws:projects"),
+        InlineKeyboardButton("~/code", callback_data="wiz:ws:code"),
+    ),
+    (InlineKeyboardButton("Custom path...", callback_data="wiz:ws:custom"),),
+    _SKIP_ROW,
+)
+
+# model_id -> (selected row, unselected row)
+_MODEL_ROWS: dict[str, tuple[tuple[InlineKeyboardButton], tuple[InlineKeyboardButton]]] = {
+    model_id: (
+        (InlineKeyboardButton(f"● {label}", callback_data=f"wiz:model:{model_id}"),),
+        (InlineKeyboardButton(f"○ {label}", callback_data=f"wiz:model:{model_id}"),),
+    )
+    for model_id, label in _MODEL_CHOICES
+}
+
+# Feature toggle rows as (field_name, short button label) pairs
+_FEATURE_KEYBOARD_LAYOUT: tuple[tuple[tuple[str, str], ...], ...] = (
+    (("agentic_mode", "Agentic mode"),),
+    (("enable_mcp", "MCP"), ("enable_memory", "Memory")),
+    (("enable_git_integration", "Git"), ("enable_file_uploads", "Files")),
+    (("enable_quick_actions", "Quick actions"), ("enable_project_threads", "Threads")),
+    (("enable_checkins", "Check-ins"), ("development_mode", "Dev mode")),
+)
+
+# (field_name, enabled) -> toggle button
+_FEATURE_BUTTONS: dict[tuple[str, bool], InlineKeyboardButton] = {
+    (key, enabled): InlineKeyboardButton(f"{'✅' if enabled else '❌'} {label}", callback_data=f"wiz:feat:{key}")
+    for row in _FEATURE_KEYBOARD_LAYOUT
+    for key, label in row
+    for enabled in (True, False)
+}
+
+_VERBOSE_ROWS = {
+    vlabel: (InlineKeyboardButton(f"📢 Output: {vlabel} (tap to cycle)", callback_data="wiz:feat:verbose_cycle"),)
+    for vlabel in _VERBOSE_LABELS.values()
+}
+
+_FEATURES_TAIL_ROWS = (
+    (InlineKeyboardButton("Continue →", callback_data="wiz:feat:done"),),
+    _SKIP_ROW,
+)
+
+_PERSONALIZATION_TAIL_ROWS = (
+    (InlineKeyboardButton("📄 Set profile path...", callback_data="wiz:pz:set:user_profile_path"),),
+    (InlineKeyboardButton("Continue →", callback_data="wiz:pz:done"),),
+    _SKIP_ROW,
+)
+
+_VOICE_TAIL_ROWS = (
+    (InlineKeyboardButton("Save & finish →", callback_data="wiz:voice:done"),),
+    _SKIP_ROW,
+)
 
 
 def _workspace_keyboard(s: Settings) -> InlineKeyboardMarkup:
     current = str(s.approved_directory)
     short = (current[:37] + "...") if len(current) > 40 else current
     return InlineKeyboardMarkup(
-        [
-            [InlineKeyboardButton(f"Keep: {short}", callback_data="wiz:ws:keep")],
-            [
-                InlineKeyboardButton("~/projects", callback_data="wiz:ws:projects"),
-                InlineKeyboardButton("~/code", callback_data="wiz:ws:code"),
-            ],
-            [InlineKeyboardButton("Custom path...", callback_data="wiz:ws:custom")],
-            [InlineKeyboardButton("Skip wizard", callback_data="wiz:skip")],
-        ]
+        ((InlineKeyboardButton(f"Keep: {short}", callback_data="wiz:ws:keep"),), *_WORKSPACE_STATIC_ROWS)
     )
 
 
 def _model_keyboard(current_model: str) -> InlineKeyboardMarkup:
-    rows = []
-    for model_id, label in _MODEL_CHOICES:
-        mark = "● " if model_id == current_model else "○ "
-        rows.append([InlineKeyboardButton(f"{mark}{label}", callback_data=f"wiz:model:{model_id}")])
-    rows.append([InlineKeyboardButton("Skip wizard", callback_data="wiz:skip")])
+    rows = [
+        selected if model_id == current_model else unselected
+        for model_id, (selected, unselected) in _MODEL_ROWS.items()
+    ]
+    rows.append(_SKIP_ROW)
     return InlineKeyboardMarkup(rows)
 
 
@@ -123,69 +177,29 @@ def _features_keyboard(context: ContextTypes.DEFAULT_TYPE) -> InlineKeyboardMark
     s = _s(context)
     verbose = _ud(context).get("wiz_verbose", s.verbose_level)
 
-    def icon(key: str) -> str:
-        return "✅" if features.get(key, getattr(s, key, False)) else "❌"
+    def button(key: str) -> InlineKeyboardButton:
+        return _FEATURE_BUTTONS[key, bool(features.get(key, getattr(s, key, False)))]
 
     vlabel = _VERBOSE_LABELS.get(verbose, "Normal")
-    return InlineKeyboardMarkup(
-        [
-            [InlineKeyboardButton(f"{icon('agentic_mode')} Agentic mode", callback_data="wiz:feat:agentic_mode")],
-            [
-                InlineKeyboardButton(f"{icon('enable_mcp')} MCP", callback_data="wiz:feat:enable_mcp"),
-                InlineKeyboardButton(f"{icon('enable_memory')} Memory", callback_data="wiz:feat:enable_memory"),
-            ],
-            [
-                InlineKeyboardButton(
-                    f"{icon('enable_git_integration')} Git",
-                    callback_data="wiz:feat:enable_git_integration",
-                ),
-                InlineKeyboardButton(
-                    f"{icon('enable_file_uploads')} Files",
-                    callback_data="wiz:feat:enable_file_uploads",
-                ),
-            ],
-            [
-                InlineKeyboardButton(
-                    f"{icon('enable_quick_actions')} Quick actions",
-                    callback_data="wiz:feat:enable_quick_actions",
-                ),
-                InlineKeyboardButton(
-                    f"{icon('enable_project_threads')} Threads",
-                    callback_data="wiz:feat:enable_project_threads",
-                ),
-            ],
-            [
-                InlineKeyboardButton(
-                    f"{icon('enable_checkins')} Check-ins",
-                    callback_data="wiz:feat:enable_checkins",
-                ),
-                InlineKeyboardButton(
-                    f"{icon('development_mode')} Dev mode",
-                    callback_data="wiz:feat:development_mode",
-                ),
-            ],
-            [InlineKeyboardButton(f"📢 Output: {vlabel} (tap to cycle)", callback_data="wiz:feat:verbose_cycle")],
-            [InlineKeyboardButton("Continue →", callback_data="wiz:feat:done")],
-            [InlineKeyboardButton("Skip wizard", callback_data="wiz:skip")],
-        ]
-    )
+    rows = [tuple(button(key) for key, _ in row) for row in _FEATURE_KEYBOARD_LAYOUT]
+    rows.append(_VERBOSE_ROWS[vlabel])
+    rows.extend(_FEATURES_TAIL_ROWS)
+    return InlineKeyboardMarkup(rows)
 
 
 def _personalization_keyboard(context: ContextTypes.DEFAULT_TYPE, s: Settings) -> InlineKeyboardMarkup:
     name = _ud(context).get("wiz_user_name", s.user_name or "not set")
     tz = _ud(context).get("wiz_user_timezone", s.user_timezone)
     return InlineKeyboardMarkup(
-        [
-            [InlineKeyboardButton(f"👤 Name: {name}", callback_data="wiz:pz:set:user_name")],
-            [InlineKeyboardButton(f"🕐 Timezone: {tz}", callback_data="wiz:pz:set:user_timezone")],
-            [InlineKeyboardButton("📄 Set profile path...", callback_data="wiz:pz:set:user_profile_path")],
-            [InlineKeyboardButton("Continue →", callback_data="wiz:pz:done")],
-            [InlineKeyboardButton("Skip wizard", callback_data="wiz:skip")],
-        ]
+        (
+            (InlineKeyboardButton(f"👤 Name: {name}", callback_data="wiz:pz:set:user_name"),),
+            (InlineKeyboardButton(f"🕐 Timezone: {tz}", callback_data="wiz:pz:set:user_timezone"),),
+            *_PERSONALIZATION_TAIL_ROWS,
+        )
     )
 
 
-def _tz_keyboard() -> InlineKeyboardMarkup:
+def _build_tz_keyboard() -> InlineKeyboardMarkup:
     rows = []
     for i in range(0, len(_TZ_PRESETS), 2):
         pair = _TZ_PRESETS[i : i + 2]
@@ -194,17 +208,24 @@ def _tz_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(rows)
 
 
+# The timezone picker has no dynamic content at all
+_TZ_KEYBOARD = _build_tz_keyboard()
+
+
+def _tz_keyboard() -> InlineKeyboardMarkup:
+    return _TZ_KEYBOARD
+
+
 def _voice_keyboard(context: ContextTypes.DEFAULT_TYPE, s: Settings) -> InlineKeyboardMarkup:
     provider = _ud(context).get("wiz_voice_provider", s.voice_provider or "")
     plabel = _VOICE_LABELS.get(provider, provider)
-    rows: list[list[InlineKeyboardButton]] = [
-        [InlineKeyboardButton(f"🎤 Provider: {plabel} (tap to cycle)", callback_data="wiz:voice:cycle")],
+    rows: list[tuple[InlineKeyboardButton, ...]] = [
+        (InlineKeyboardButton(f"🎤 Provider: {plabel} (tap to cycle)", callback_data="wiz:voice:cycle"),),
     ]
     if provider == "local":
         binary = _ud(context).get("wiz_whisper_binary", s.whisper_binary)
-        rows.append([InlineKeyboardButton(f"🔧 Binary: {binary}", callback_data="wiz:voice:binary")])
-    rows.append([InlineKeyboardButton("Save & finish →", callback_data="wiz:voice:done")])
-    rows.append([InlineKeyboardButton("Skip wizard", callback_data="wiz:skip")])
+        rows.append((InlineKeyboardButton(f"🔧 Binary: {binary}", callback_data="wiz:voice:binary"),))
+    rows.extend(_VOICE_TAIL_ROWS)
     return InlineKeyboardMarkup(rows)
 
 
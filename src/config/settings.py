@@ -200,6 +200,8 @@ class Settings(BaseSettings):
     groq_api_key: SecretStr | None = Field(None, description="Groq API key for voice transcription")
     whisper_binary: str = Field("whisper-cpp", description="Path to whisper.cpp binary (local provider)")
     whisper_model_path: str | None = Field(None, description="Path to whisper.cpp model file")
+    whisper_threads: int = Field(0, description="whisper.cpp worker threads (0 = all CPU cores)", ge=0)
+    whisper_use_gpu: bool = Field(True, description="Let whisper.cpp use the GPU when it was built with GPU support")
 
     # Semantic memory
     enable_memory: bool = Field(False, description="Enable persistent semantic memory")
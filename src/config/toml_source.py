@@ -121,6 +121,8 @@ SECTION_MAP: dict[str, list[str]] = {
         "groq_api_key",
         "whisper_binary",
         "whisper_model_path",
+        "whisper_threads",
+        "whisper_use_gpu",
     ],
     "memory": [
         "enable_memory",
@@ -218,6 +218,10 @@ voice_provider = ""
 groq_api_key = ""
 whisper_binary = "whisper-cpp"
 whisper_model_path = ""
+# whisper.cpp worker threads (0 = all CPU cores)
+whisper_threads = 0
+# Set to false to force CPU inference on a GPU-enabled whisper.cpp build
+whisper_use_gpu = true
 
 # ── Memory ────────────────────────────────────────────────────────────────────
 
@@ -13,6 +13,7 @@ import structlog
 from src import __version__
 from src.bot.core import ClaudeCodeBot
 from src.bot.features.voice_handler import VoiceHandler
+from src.bot.handlers.message import drain_background_tasks
 from src.claude import (
     ClaudeIntegration,
     SessionManager,
@@ -405,6 +406,7 @@ async def create_application(config: Settings) -> dict[str, Any]:
         "agent_handler": agent_handler,
         "auth_manager": auth_manager,
         "security_validator": security_validator,
+        "voice_handler": voice_handler,
     }
 
 
@@ -417,6 +419,7 @@ async def run_application(app: dict[str, Any]) -> None:
     config: Settings = app["config"]
     features: FeatureFlags = app["features"]
     event_bus: EventBus = app["event_bus"]
+    voice_handler: VoiceHandler | None = app.get("voice_handler")
 
     notification_service: NotificationService | None = None
     scheduler: JobScheduler | None = None
@@ -560,7 +563,7 @@ async def run_application(app: dict[str, Any]) -> None:
         logger.error("Application error", error=str(e))
         raise
     finally:
-        # Ordered shutdown: scheduler -> API -> notification -> bot -> claude -> storage
+        # Ordered shutdown: scheduler -> API -> notification -> bot -> voice -> claude -> background writes -> storage
         logger.info("Shutting down application")
 
         try:
@@ -570,7 +573,10 @@ async def run_application(app: dict[str, Any]) -> None:
                 await notification_service.stop()
             await event_bus.stop()
             await bot.stop()
+            if voice_handler:
+                await voice_handler.aclose()
             await claude_integration.shutdown()
+            await drain_background_tasks()
             await storage.close()
         except Exception as e:
             logger.error("Error during shutdown", error=str(e))
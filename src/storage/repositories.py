@@ -121,6 +121,28 @@ class SessionRepository:
             row = await cursor.fetchone()
             return SessionModel.from_row(row) if row else None
 
+    async def get_session_with_messages(
+        self, session_id: str, message_limit: int = 50
+    ) -> tuple[SessionModel | None, list[MessageModel]]:
+        """Get session and its latest messages over a single pooled connection."""
+        async with self.db.get_connection() as conn:
+            cursor = await conn.execute("SELECT * FROM sessions WHERE session_id = ?", (session_id,))
+            row = await cursor.fetchone()
+            if not row:
+                return None, []
+
+            cursor = await conn.execute(
+                """
+                SELECT * FROM messages
+                WHERE session_id = ?
+                ORDER BY timestamp DESC
+                LIMIT ?
+            """,
+                (session_id, message_limit),
+            )
+            rows = await cursor.fetchall()
+            return SessionModel.from_row(row), [MessageModel.from_row(r) for r in rows]
+
     async def create_session(self, session: SessionModel) -> SessionModel:
         """Create new session."""
         async with self.db.get_connection() as conn:
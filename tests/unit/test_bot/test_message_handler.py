@@ -0,0 +1,69 @@
+"""Tests for helpers in the message handler module."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.bot.handlers import message
+
+
+async def test_drain_waits_for_background_writes():
+    done: list[str] = []
+
+    async def write(name: str) -> None:
+        await asyncio.sleep(0.01)
+        done.append(name)
+
+    async def fail() -> None:
+        raise RuntimeError("boom")
+
+    message._spawn_background(write("a"), "a")
+    message._spawn_background(write("b"), "b")
+    message._spawn_background(fail(), "fail")
+    await message.drain_background_tasks()
+    assert sorted(done) == ["a", "b"]
+    assert not message._background_tasks
+
+
+def test_prune_send_buckets_drops_only_refilled(monkeypatch):
+    monkeypatch.setattr(message, "_send_buckets", {1: (-1.0, 100.0), 2: (0.0, 99.0), 3: (0.5, 100.0)})
+    message._prune_send_buckets(100.5)
+    assert set(message._send_buckets) == {1, 3}
+
+
+# ── _update_working_directory_from_claude_response ────────────────────────────
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """An approved root at <tmp>/app with a sibling <tmp>/apple beside it."""
+    root = tmp_path / "app"
+    (root / "sub").mkdir(parents=True)
+    (tmp_path / "other").mkdir()
+    (tmp_path / "apple").mkdir()
+    return root.resolve()
+
+
+def _cd(root, text):
+    context = SimpleNamespace(user_data={"current_directory": root})
+    settings = SimpleNamespace(approved_directory=root)
+    message._update_working_directory_from_claude_response(SimpleNamespace(content=text), context, settings, 1)
+    return context.user_data["current_directory"]
+
+
+def test_cd_into_subdirectory_is_accepted(tree):
+    assert _cd(tree, "cd sub") == tree / "sub"
+
+
+def test_cd_to_parent_sibling_is_rejected(tree):
+    assert _cd(tree, "cd ../other") == tree
+
+
+def test_cd_through_escaping_symlink_is_rejected(tree):
+    (tree / "link").symlink_to(tree.parent / "other")
+    assert _cd(tree, "cd link") == tree
+
+
+def test_cd_to_sibling_sharing_the_prefix_is_rejected(tree):
+    assert _cd(tree, f"working directory: {tree.parent / 'apple'}") == tree
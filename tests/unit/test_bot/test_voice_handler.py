@@ -0,0 +1,90 @@
+"""Tests for the local whisper.cpp transcription pipeline."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.bot.features import voice_handler
+from src.bot.features.voice_handler import VoiceHandler
+
+
+class FakeProcess:
+    """Stand-in for asyncio.subprocess.Process; communicate() reaps it."""
+
+    def __init__(self, exit_code: int, stdout: bytes = b"", stderr: bytes = b"") -> None:
+        self._exit_code = exit_code
+        self._out = (stdout, stderr)
+        self.stdin_data: bytes | None = None
+        self.returncode: int | None = None
+
+    async def communicate(self, data: bytes) -> tuple[bytes, bytes]:
+        self.stdin_data = data
+        self.returncode = self._exit_code
+        return self._out
+
+
+@pytest.fixture
+def spawn(monkeypatch):
+    """Patch create_subprocess_exec to hand out queued FakeProcesses in order."""
+    queued: list[FakeProcess] = []
+    started: list[tuple[tuple, FakeProcess]] = []
+
+    async def create_subprocess_exec(*cmd, **kwargs):
+        proc = queued.pop(0)
+        started.append((cmd, proc))
+        return proc
+
+    monkeypatch.setattr(voice_handler.asyncio, "create_subprocess_exec", create_subprocess_exec)
+    return SimpleNamespace(queued=queued, started=started)
+
+
+@pytest.fixture
+def handler():
+    config = SimpleNamespace(
+        voice_provider="local",
+        whisper_binary="whisper-cli",
+        whisper_model_path="/models/base.bin",
+        whisper_threads=2,
+        whisper_use_gpu=False,
+        preferred_language="Romanian",
+    )
+    return VoiceHandler(config)  # type: ignore[arg-type]
+
+
+async def test_local_transcription_pipes_audio_through_both_processes(spawn, handler):
+    pcm = b"\x01\x00" * 8
+    ffmpeg = FakeProcess(0, stdout=pcm)
+    whisper = FakeProcess(0, stdout=b"  salut  \n")
+    spawn.queued += [ffmpeg, whisper]
+
+    assert await handler.transcribe(b"ogg") == "salut"
+
+    assert ffmpeg.stdin_data == b"ogg"
+    assert whisper.stdin_data == voice_handler._wav_header(len(pcm)) + pcm
+    whisper_cmd = spawn.started[1][0]
+    assert whisper_cmd[0] == "whisper-cli"
+    assert whisper_cmd[whisper_cmd.index("-t") + 1] == "2"
+    assert "-ng" in whisper_cmd and whisper_cmd[-2:] == ("-l", "ro")
+    assert all(proc.returncode is not None for _, proc in spawn.started)
+
+
+async def test_ffmpeg_failure_stops_before_whisper(spawn, handler):
+    ffmpeg = FakeProcess(1)
+    spawn.queued.append(ffmpeg)
+
+    with pytest.raises(RuntimeError, match="ffmpeg conversion failed"):
+        await handler.transcribe(b"ogg")
+
+    assert len(spawn.started) == 1
+    assert ffmpeg.returncode == 1
+
+
+async def test_whisper_failure_reports_stderr(spawn, handler):
+    ffmpeg = FakeProcess(0, stdout=b"\x00\x00")
+    whisper = FakeProcess(3, stderr=b"model not found")
+    spawn.queued += [ffmpeg, whisper]
+
+    with pytest.raises(RuntimeError, match="exited with code 3: model not found"):
+        await handler.transcribe(b"ogg")
+
+    assert ffmpeg.returncode == 0 and whisper.returncode == 3
@@ -463,6 +463,22 @@ def test_project_threads_validation_invalid_mode(tmp_path):
     assert "project_threads_mode must be one of" in str(exc_info.value)
 
 
+def test_whisper_threads_rejects_negative(tmp_path):
+    """A negative whisper.cpp thread count should fail validation."""
+    project_dir = tmp_path / "projects"
+    project_dir.mkdir()
+
+    with pytest.raises(ValidationError) as exc_info:
+        Settings(
+            telegram_bot_token="test_token",
+            telegram_bot_username="test_bot",
+            approved_directory=str(project_dir),
+            whisper_threads=-1,
+        )
+
+    assert "whisper_threads" in str(exc_info.value)
+
+
 def test_computed_properties(tmp_path):
     """Test computed properties."""
     test_dir = tmp_path / "projects"
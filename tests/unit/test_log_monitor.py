@@ -0,0 +1,199 @@
+"""Tests for the deploy/log_monitor.py journald watcher."""
+
+import importlib.util
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+_PATH = Path(__file__).resolve().parents[2] / "deploy" / "log_monitor.py"
+_spec = importlib.util.spec_from_file_location("log_monitor", _PATH)
+assert _spec and _spec.loader
+log_monitor = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(log_monitor)
+
+
+@pytest.fixture
+def claude(monkeypatch):
+    """Route classify() to a fake Anthropic client and record what it was asked."""
+    asked: list[str] = []
+
+    def create(**kwargs):
+        asked.append(kwargs["messages"][0]["content"])
+        return SimpleNamespace(content=[SimpleNamespace(text="WARNING")])
+
+    client = SimpleNamespace(messages=SimpleNamespace(create=create))
+    monkeypatch.setattr(log_monitor, "anthropic_key", lambda: "sk-test")
+    monkeypatch.setattr(log_monitor, "_anthropic_client", lambda api_key: client)
+    return asked
+
+
+# ── classify / _heuristic_match ───────────────────────────────────────────────
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "Database disconnected unexpectedly",
+        "Error mapping tool response: KeyError",
+        "Bot failed: scheduler not started",
+    ],
+)
+def test_failures_with_lifecycle_substrings_go_to_claude(claude, line):
+    assert log_monitor._heuristic_match(line) is None
+    assert log_monitor.classify(line) == "WARNING"
+    assert len(claude) == 1
+
+
+def test_critical_checked_before_lifecycle_words(claude):
+    line = "Stopping after segfault in worker"
+    assert log_monitor.classify(line) == "CRITICAL"
+    assert claude == []
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        '{"event": "Rate limit exceeded", "logger": "src.security.rate_limiter", "level": "warning"}',
+        '{"event": "Authentication failed", "logger": "src.security.auth", "level": "warning"}',
+        '{"event": "Zoom room booking failed", "level": "error"}',
+        "FATAL: data corruption detected during shutdown",
+        "Unauthorized request rejected",
+    ],
+)
+def test_weak_or_incidental_keywords_go_to_claude(claude, line):
+    assert log_monitor._heuristic_match(line) is None
+    assert log_monitor.classify(line) == "WARNING"
+    assert len(claude) == 1
+
+
+def test_sure_critical_matched_on_event_text(claude):
+    line = '{"event": "worker panicked: out of memory", "logger": "src.claude.sdk", "level": "error"}'
+    assert log_monitor.classify(line) == "CRITICAL"
+    assert claude == []
+
+
+def test_plain_text_keywords_need_word_boundaries():
+    assert log_monitor._parse_message("joined chatroom 42") is None
+    assert log_monitor._parse_message("worker crashed") == ("worker crashed", "unknown")
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "Started claude-telegram-bot.service - Claude Telegram Bot.",
+        "Stopping claude-telegram-bot.service...",
+        "heartbeat ok",
+        '"POST /bot123/getUpdates HTTP/1.1 200 OK"',
+    ],
+)
+def test_lifecycle_lines_ignored_locally(claude, line):
+    assert log_monitor.classify(line) == "IGNORE"
+    assert claude == []
+
+
+def test_ambiguous_line_without_api_key_is_warning(monkeypatch):
+    monkeypatch.setattr(log_monitor, "anthropic_key", lambda: None)
+    assert log_monitor.classify("Database disconnected unexpectedly") == "WARNING"
+
+
+# ── normalize ─────────────────────────────────────────────────────────────────
+
+
+@pytest.mark.parametrize(
+    ("line", "normalized"),
+    [
+        ("Timeout for session_AB12 after 30s at 10.0.0.1", "timeout for <x> after 30s at <x>"),
+        ("GET /api/v1/users/42 failed: 0xDEADbeef", "get <x> failed: <x>"),
+        ("job 2024-05-01T10:00:00Z retry 3 of 5", "job <x> retry <x> of <x>"),
+        ("lost session_0b1d2c3e-1111-2222-3333-444455556666", "lost <x>"),
+        ("SESSION_Ab expired, bad ptr 0XFF", "<x> expired, bad ptr <x>"),
+    ],
+)
+def test_normalize_output_is_pinned(line, normalized):
+    # Dedupe hashes are derived from this output; changing it re-alerts on
+    # every pattern already in state.
+    assert log_monitor.normalize(line) == normalized
+
+
+# ── flush_alerts ──────────────────────────────────────────────────────────────
+
+
+@pytest.fixture
+def telegram(monkeypatch):
+    """Capture outgoing Telegram messages; ``statuses`` scripts the replies."""
+    sent: list[str] = []
+    statuses: list[int | None] = []
+
+    def post(text):
+        sent.append(text)
+        return statuses.pop(0) if statuses else None
+
+    monkeypatch.setattr(log_monitor, "_post_telegram", post)
+    monkeypatch.setattr(log_monitor, "_pending_alerts", [])
+    return SimpleNamespace(sent=sent, statuses=statuses)
+
+
+def test_alert_escapes_log_sample(telegram, monkeypatch):
+    monkeypatch.setattr(log_monitor, "append_error_log", lambda *a: "errors.log")
+    monkeypatch.setattr(log_monitor, "mark_dirty", lambda state: None)
+    log_monitor.record_new_pattern({}, "abc", "bad <tag> & stuff", "norm", "WARNING", 0.0, 0.0)
+    log_monitor.flush_alerts(force=True)
+    assert "<code>bad &lt;tag&gt; &amp; stuff</code>" in telegram.sent[0]
+
+
+def test_batches_split_between_alerts(telegram, monkeypatch):
+    alerts = [f"<code>{i}{'x' * 1500}</code>" for i in range(5)]
+    log_monitor._pending_alerts.extend(alerts)
+    log_monitor.flush_alerts(force=True)
+    assert len(telegram.sent) > 1
+    assert all(len(msg) <= log_monitor.TELEGRAM_MAX_LENGTH for msg in telegram.sent)
+    assert [a for msg in telegram.sent for a in msg.split(log_monitor._ALERT_SEPARATOR)] == alerts
+
+
+def test_rejected_batch_resent_one_by_one(telegram):
+    log_monitor._pending_alerts.extend(["one", "two"])
+    telegram.statuses.append(400)
+    log_monitor.flush_alerts(force=True)
+    assert telegram.sent == [f"one{log_monitor._ALERT_SEPARATOR}two", "one", "two"]
+    assert log_monitor._pending_alerts == []
+
+
+# ── _JournalPump ──────────────────────────────────────────────────────────────
+
+
+def test_pump_close_interrupts_blocked_read_then_closes_source():
+    events: list[str] = []
+    woken = threading.Event()
+
+    class Source:
+        def read(self, timeout):
+            woken.wait()  # blocks like readline() on journalctl's pipe
+            events.append("read returned")
+            return None
+
+        def interrupt(self):
+            events.append("interrupt")
+            woken.set()
+
+        def close(self):
+            events.append("close")
+
+    pump = log_monitor._JournalPump(Source())
+    started = time.monotonic()
+    pump.close()
+    pump.close()
+    assert time.monotonic() - started < 1
+    assert not pump._thread.is_alive()
+    assert events == ["interrupt", "read returned", "close"]
+
+
+def test_journalctl_source_interrupt_unblocks_readline(monkeypatch):
+    monkeypatch.setattr(log_monitor, "_journal_cmd", lambda: ["sleep", "30"])
+    pump = log_monitor._JournalPump(log_monitor._JournalctlSource())
+    started = time.monotonic()
+    pump.close()
+    assert time.monotonic() - started < 2
+    assert pump.source.proc.poll() is not None
@@ -259,6 +259,45 @@ class TestSessionRepository:
         assert len(active_sessions) == 1
         assert active_sessions[0].session_id == "recent-session"
 
+    async def test_get_session_with_messages(self, session_repo, message_repo, user_repo):
+        """Test fetching a session together with its messages."""
+        user = UserModel(
+            user_id=12353,
+            telegram_username="bundleuser",
+            first_seen=datetime.now(UTC),
+            last_active=datetime.now(UTC),
+            is_allowed=True,
+        )
+        await user_repo.create_user(user)
+
+        session = SessionModel(
+            session_id="bundle-session",
+            user_id=12353,
+            project_path="/test/bundle",
+            created_at=datetime.now(UTC),
+            last_used=datetime.now(UTC),
+        )
+        await session_repo.create_session(session)
+
+        for i in range(3):
+            await message_repo.save_message(
+                MessageModel(
+                    session_id="bundle-session",
+                    user_id=12353,
+                    timestamp=datetime.now(UTC) + timedelta(seconds=i),
+                    prompt=f"Prompt {i}",
+                )
+            )
+
+        found, messages = await session_repo.get_session_with_messages("bundle-session", message_limit=2)
+        assert found is not None
+        assert found.project_path == "/test/bundle"
+        assert [m.prompt for m in messages] == ["Prompt 2", "Prompt 1"]
+
+        missing, no_messages = await session_repo.get_session_with_messages("no-such-session")
+        assert missing is None
+        assert no_messages == []
+
 
 class TestMessageRepository:
     """Test message repository."""